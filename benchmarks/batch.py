@@ -0,0 +1,62 @@
+"""
+Measures how the batch analysis scales with the number of worker processes, on
+the premade characters in every toggle state against a sweep of ACs, and checks
+every worker count gives the same results.
+
+    python -m benchmarks.batch [rounds] [max workers]
+"""
+
+import os
+import pickle
+import sys
+import time
+
+from pfchar import batch
+from pfchar.premade import YOYU, DORAMAK, CHELLYBEAN
+
+ARMOUR_CLASSES = range(20, 46)
+SEED = 0
+
+
+def worker_counts(maximum: int) -> list[int]:
+    counts = [1]
+    while counts[-1] * 2 < maximum:
+        counts.append(counts[-1] * 2)
+    if maximum > 1:
+        counts.append(maximum)
+    return counts
+
+
+def main(rounds: int = 200_000, max_workers: int | None = None):
+    characters = [YOYU, DORAMAK, CHELLYBEAN]
+    max_workers = max_workers or os.cpu_count() or 1
+    cases = [case for c in characters for case in batch.character_cases(c)]
+    payload = len(pickle.dumps(cases))
+    print(
+        f"{len(cases)} cases x {len(ARMOUR_CLASSES)} ACs x {rounds:,} rounds, "
+        f"{payload / len(cases):.0f} bytes per pickled case, "
+        f"{os.cpu_count()} CPUs"
+    )
+
+    baseline = None
+    expected = None
+    for workers in worker_counts(max_workers):
+        start = time.perf_counter()
+        results = batch.analyse(
+            characters, ARMOUR_CLASSES, rounds=rounds, workers=workers, seed=SEED
+        )
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        speedup = baseline / elapsed
+        print(
+            f"{workers:>3} workers: {elapsed:.2f}s, speedup {speedup:.2f}x, "
+            f"efficiency {speedup / workers:.0%}"
+        )
+        simulations = [result.simulation for result in results]
+        expected = expected or simulations
+        if simulations != expected:
+            print("  results differ from a single worker")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
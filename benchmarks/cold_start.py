@@ -0,0 +1,72 @@
+"""
+Measures the wall time of printing a sheet from a fresh interpreter, against
+an interpreter which does nothing, and checks NiceGUI is never imported. The
+budget applies to the time added over the bare interpreter, as its own startup
+depends on what's installed in site-packages.
+
+    python -m benchmarks.cold_start [runs]
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+BUDGET = 0.1
+COMMANDS = {
+    "python -c pass": [sys.executable, "-c", "pass"],
+    "python -m pfchar yoyu": [sys.executable, "-m", "pfchar", "yoyu"],
+    "python -m pfchar yoyu (enable, status)": [
+        sys.executable,
+        "-m",
+        "pfchar",
+        "yoyu",
+        "--enable",
+        "Power Attack",
+        "--status",
+        "Bless:attack=1",
+        "--breakdown",
+    ],
+}
+
+
+def time_command(command: list[str], runs: int) -> list[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main(runs: int = 20):
+    baseline = None
+    for name, command in COMMANDS.items():
+        timings = time_command(command, runs)
+        best = min(timings)
+        median = statistics.median(timings)
+        baseline = best if baseline is None else baseline
+        print(
+            f"{name}: min {best * 1000:.1f}ms, median {median * 1000:.1f}ms "
+            f"(+{(best - baseline) * 1000:.1f}ms over bare interpreter)"
+        )
+        if best - baseline > BUDGET:
+            print(f"  over the {BUDGET * 1000:.0f}ms budget")
+
+    check = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys; from pfchar import __main__ as cli; "
+            "cli.format_sheet(cli.find_character(cli.load_characters(None), 'yoyu')); "
+            "print('nicegui' in sys.modules)",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    print(f"nicegui imported: {check.stdout.strip()}")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,40 @@
+"""
+Times the damage progression lookup table against the original recursive
+implementation in tests/damage_progression_reference.py.
+
+    python -m benchmarks.damage_progression
+"""
+
+import timeit
+
+from pfchar.char.base import Dice, Size
+from pfchar.utils import get_damage_progression
+from tests.damage_progression_reference import reference_damage_progression
+
+
+def main():
+    cases = [
+        (Dice(num=1, sides=8), Size.MEDIUM, Size.LARGE),
+        (Dice(num=2, sides=6), Size.MEDIUM, Size.COLOSSAL),
+        (Dice(num=1, sides=3), Size.SMALL, Size.TINY),
+        (Dice(num=5, sides=6), Size.MEDIUM, Size.HUGE),
+    ]
+    for damage, from_size, to_size in cases:
+        times = {}
+        for name, func in (
+            ("recursive", reference_damage_progression),
+            ("table", get_damage_progression),
+        ):
+            number = 20_000
+            elapsed = timeit.timeit(
+                lambda: func(damage, from_size, to_size), number=number
+            )
+            times[name] = elapsed / number * 1e6
+        print(
+            f"{damage.num}d{damage.sides} {from_size.name} -> {to_size.name}: "
+            f"recursive {times['recursive']:.2f}us, table {times['table']:.2f}us"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Measures the memory used by thousands of loaded characters, and the memory
+allocated while recomputing their damage and full sheets.
+
+    python -m benchmarks.memory [characters]
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+
+from pfchar import serialize
+from pfchar.char.base import Dice
+from pfchar.premade import YOYU, DORAMAK, CHELLYBEAN
+
+
+def load_characters(count: int) -> list:
+    # Decoded from JSON so every character has its own effects, like a library.
+    lines = [serialize.dumps(c) for c in (YOYU, DORAMAK, CHELLYBEAN)]
+    return [serialize.loads(lines[i % len(lines)]) for i in range(count)]
+
+
+def measure(label: str, func, count: int):
+    """Prints the memory still held after ``func`` and the peak while it ran."""
+    gc.collect()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    after, peak = tracemalloc.get_traced_memory()
+    print(
+        f"{label}: {(after - before) / count:,.0f} B/character retained, "
+        f"{(peak - before) / count:,.0f} B/character peak, "
+        f"{elapsed / count * 1e6:,.1f}us/character"
+    )
+    return result
+
+
+def main(count: int = 5000):
+    effect = YOYU.feats[0]
+    print(f"Dice: {sys.getsizeof(Dice(1, 6))} B, has __dict__: ", end="")
+    print(hasattr(Dice(1, 6), "__dict__"))
+    print(f"{type(effect).__name__}: has __dict__: {hasattr(effect, '__dict__')}")
+
+    tracemalloc.start()
+    characters = measure("load", lambda: load_characters(count), count)
+
+    def sheets():
+        return [c.snapshot() for c in characters]
+
+    snapshots = measure("snapshot", sheets, count)
+
+    # Invalidated first, so freeing the old cache doesn't hide the allocations.
+    for character in characters:
+        character.invalidate()
+
+    def damage():
+        for character in characters:
+            character.damage_bonus()
+
+    measure("damage", damage, count)
+    tracemalloc.stop()
+    del snapshots
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
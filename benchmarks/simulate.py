@@ -0,0 +1,36 @@
+"""
+Measures Monte Carlo full-attack throughput for the premade characters, of the
+dice rolling Simulator and its SampledSimulator fast path.
+
+    python -m benchmarks.simulate [rounds]
+"""
+
+import sys
+import time
+
+from pfchar import probability
+from pfchar.premade import YOYU, DORAMAK, CHELLYBEAN
+from pfchar.simulate import SampledSimulator, Simulator
+
+ARMOUR_CLASS = 35
+
+
+def main(rounds: int = 1_000_000):
+    for character in (YOYU, DORAMAK, CHELLYBEAN):
+        sheet = character.snapshot()
+        exact = probability.expected_damage(sheet, ARMOUR_CLASS)
+        print(f"{character.name}: exact mean {exact:.2f}")
+        for simulator_class in (Simulator, SampledSimulator):
+            simulator = simulator_class(sheet, ARMOUR_CLASS)
+            start = time.perf_counter()
+            result = simulator.run(rounds, seed=0)
+            elapsed = time.perf_counter() - start
+            print(
+                f"  {simulator_class.__name__}: {rounds / elapsed:,.0f} rounds/s "
+                f"({len(simulator.attack_bonuses)} attacks/round), "
+                f"hit rate {result.hit_rate:.3f}, crit rate {result.crit_rate:.3f}, "
+                f"mean {result.mean:.2f}, percentiles {result.percentiles}"
+            )
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
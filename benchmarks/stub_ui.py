@@ -0,0 +1,83 @@
+"""
+Minimal stand-in for NiceGUI, so the render functions in pfchar.web can be
+timed without a server or a connected client. Elements only keep their text
+and value, which measures the cost of pfchar's own code rather than NiceGUI's.
+"""
+
+import sys
+import types
+
+TAB_ID = "benchmark"
+
+
+class Element:
+    created = 0
+
+    def __init__(self, text="", *args, value=None, **kwargs):
+        Element.created += 1
+        self.text = text if isinstance(text, str) else ""
+        self.value = value
+        self.visible = True
+
+    def classes(self, *args, **kwargs) -> "Element":
+        return self
+
+    props = style = on = on_value_change = classes
+
+    def set_text(self, text: str):
+        self.text = text
+
+    def set_value(self, value):
+        self.value = value
+
+    def clear(self):
+        pass
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def __enter__(self) -> "Element":
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+class Refreshable:
+    def __init__(self, func):
+        self.func = func
+
+    def __call__(self, *args, **kwargs):
+        return self.func(*args, **kwargs)
+
+    refresh = __call__
+
+
+class _UI(types.ModuleType):
+    # Every element type (label, row, expansion, ...) is the same stub.
+    def __getattr__(self, name: str):
+        return Element
+
+
+def install(tab_id: str = TAB_ID):
+    """Replaces nicegui in sys.modules. Must be called before importing pfchar.web."""
+    ui = _UI("nicegui.ui")
+    ui.refreshable = Refreshable
+    ui.page = lambda *args, **kwargs: (lambda func: func)
+    ui.run = lambda *args, **kwargs: None
+    ui.context = types.SimpleNamespace(client=types.SimpleNamespace(tab_id=tab_id))
+    app = types.SimpleNamespace(
+        storage=types.SimpleNamespace(tab={}, client={}),
+        on_shutdown=lambda func: None,
+        on_disconnect=lambda func: None,
+        include_router=lambda router: None,
+    )
+    nicegui = types.ModuleType("nicegui")
+    nicegui.ui = ui
+    nicegui.app = app
+    nicegui.Client = types.SimpleNamespace(instances={})
+    sys.modules["nicegui"] = nicegui
+    sys.modules["nicegui.ui"] = ui
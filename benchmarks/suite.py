@@ -0,0 +1,398 @@
+"""
+Benchmark suite for Character queries, full sheets, the toggle optimiser,
+damage progression, dice expressions and the web render functions (against a
+stubbed UI).
+
+    python -m benchmarks.suite [-k FILTER] [--save]
+    python -m benchmarks.suite --compare BASELINE.json [CURRENT.json]
+
+Each benchmark reports the best time per call over several repeats. Queries
+are timed cold, ie, with the character's cache invalidated before each call.
+--save writes the results to benchmarks/results/<commit>.json, and --compare
+reports the change from a saved baseline to a saved or fresh run, exiting with
+an error if anything got slower than the threshold.
+"""
+
+import argparse
+import dataclasses
+import datetime
+import functools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable
+
+from benchmarks import stub_ui
+from pfchar import dice, optimize, whatif
+from pfchar.char.base import ArmorBonus, Save, Size, Statistic
+from pfchar.char.character import Character
+from pfchar.char.feats import PowerAttack
+from pfchar.session import Session
+from pfchar.premade import YOYU, DORAMAK, CHELLYBEAN
+from pfchar.utils import (
+    DAMAGE_PROGRESSION,
+    create_status_effect,
+    get_damage_progression,
+)
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+# The optimiser visits every toggle state, so it's skipped with more toggles.
+OPTIMISE_MAX_TOGGLES = 12
+OPTIMISE_ARMOUR_CLASSES = range(20, 46)
+QUERIES = {
+    "modified_statistic": lambda c: c.modified_statistic(Statistic.STRENGTH),
+    "attack_bonus": Character.attack_bonus,
+    "damage_bonus": Character.damage_bonus,
+    "critical_bonus": Character.critical_bonus,
+    "get_size": Character.get_size,
+    "armour_bonuses": Character.armour_bonuses,
+    "is_dex_capped": Character.is_dex_capped,
+    "get_cmb": Character.get_cmb,
+    "get_cmd": Character.get_cmd,
+    "get_saves": Character.get_saves,
+    "get_hp_offset": Character.get_hp_offset,
+}
+
+
+def synthetic_character(effects: int, seed: int = 0) -> Character:
+    """A premade character with ``effects`` extra random statuses and toggles."""
+    rng = random.Random(seed)
+
+    def bonuses(enum_class: type, chance: float) -> dict:
+        if rng.random() > chance:
+            return {}
+        return {rng.choice(list(enum_class)): rng.randint(-4, 4)}
+
+    statuses = [
+        create_status_effect(
+            f"Effect {i}",
+            attack_bonus=rng.randint(-2, 3),
+            damage_bonus=rng.randint(-2, 3),
+            statistics=bonuses(Statistic, 0.3),
+            saves=bonuses(Save, 0.3),
+            ac_bonuses=bonuses(ArmorBonus, 0.3),
+        )
+        for i in range(effects)
+    ]
+    toggles = [PowerAttack(name=f"Toggle {i}") for i in range(effects // 20)]
+    base = YOYU.fork()
+    return dataclasses.replace(
+        base,
+        name=f"Synthetic {effects}",
+        feats=base.feats + toggles,
+        statuses=base.statuses + statuses,
+    )
+
+
+def characters() -> list[Character]:
+    return [
+        YOYU.fork(),
+        DORAMAK.fork(),
+        CHELLYBEAN.fork(),
+        synthetic_character(100),
+        synthetic_character(500),
+    ]
+
+
+def _toggleable(character: Character):
+    return next(
+        (
+            effect
+            for effect in character.all_effects()
+            if hasattr(effect.condition, "toggle")
+        ),
+        None,
+    )
+
+
+def character_benchmarks(character: Character) -> dict[str, Callable[[], object]]:
+    benchmarks = {}
+    for name, query in QUERIES.items():
+
+        def cold(query=query):
+            character.invalidate()
+            return query(character)
+
+        benchmarks[f"query.{name}[{character.name}]"] = cold
+
+    def snapshot():
+        character.invalidate()
+        return character.snapshot()
+
+    benchmarks[f"sheet.snapshot[{character.name}]"] = snapshot
+    benchmarks[f"sheet.snapshot_cached[{character.name}]"] = character.snapshot
+
+    effect = _toggleable(character)
+    if effect is not None:
+
+        def toggle():
+            character.toggle_condition(effect)
+            return character.snapshot()
+
+        benchmarks[f"sheet.toggle[{character.name}]"] = toggle
+
+    if len(optimize.get_toggles(character)) <= OPTIMISE_MAX_TOGGLES:
+
+        def optimise():
+            return optimize.optimise(character, OPTIMISE_ARMOUR_CLASSES)
+
+        benchmarks[f"analysis.optimise[{character.name}]"] = optimise
+    return benchmarks
+
+
+def damage_progression_benchmarks() -> dict[str, Callable[[], object]]:
+    lookups = []
+    for damage in DAMAGE_PROGRESSION:
+        for from_size in Size:
+            for to_size in Size:
+                try:
+                    get_damage_progression(damage, from_size, to_size)
+                except IndexError:
+                    continue
+                lookups.append((damage, from_size, to_size))
+
+    def all_sizes():
+        for damage, from_size, to_size in lookups:
+            get_damage_progression(damage, from_size, to_size)
+
+    return {f"damage_progression.lookups[{len(lookups)}]": all_sizes}
+
+
+def dice_benchmarks() -> dict[str, Callable[[], object]]:
+    rng = random.Random(0)
+    types = ("", " fire", " cold", " vs undead", " slashing")
+    expressions = [
+        f"{rng.randint(1, 4)}d{rng.choice((4, 6, 8, 10))}+{rng.randint(0, 5)}"
+        f"{rng.choice(types)} + {rng.randint(1, 3)}d6{rng.choice(types)}"
+        for _ in range(1000)
+    ]
+    # A library of stored statuses repeats a small set of expressions.
+    stored = [rng.choice(expressions[:50]) for _ in range(1000)]
+
+    def parse_cold():
+        dice.parse.cache_clear()
+        for expression in expressions:
+            dice.parse(expression)
+
+    def parse_stored():
+        dice.parse.cache_clear()
+        for expression in stored:
+            dice.parse(expression)
+
+    compiled = dice.parse("3d6+2d8+4 fire")
+    roll_rng = random.Random(0)
+    return {
+        f"dice.parse_unique[{len(expressions)}]": parse_cold,
+        f"dice.parse_stored[{len(stored)}]": parse_stored,
+        "dice.roll": lambda: compiled.roll(roll_rng),
+        "dice.roll_many[1000]": lambda: compiled.roll_many(1000, roll_rng),
+    }
+
+
+def render_benchmarks(chars: list[Character]) -> dict[str, Callable[[], object]]:
+    stub_ui.install()
+    os.environ["PFCHAR_STATE"] = os.path.join(tempfile.mkdtemp(), "state.sqlite3")
+    from pfchar import web
+
+    # Pages open the session before rendering.
+    web.SESSIONS[stub_ui.TAB_ID] = Session(web.ALL_CHARACTERS)
+    benchmarks = {}
+    for character in chars:
+
+        def select(character=character):
+            web.get_character = web.edit_character = lambda: character
+
+        def timed(func, character=character):
+            def run():
+                select(character)
+                character.invalidate()
+                return func()
+
+            return run
+
+        select()
+        web.render_page()
+        benchmarks[f"render.statistics[{character.name}]"] = timed(
+            web.render_statistics
+        )
+        benchmarks[f"render.combat_modifiers[{character.name}]"] = timed(
+            web.render_combat_modifiers
+        )
+        benchmarks[f"render.page[{character.name}]"] = timed(web.render_page)
+
+        effect = _toggleable(character)
+        if effect is not None:
+
+            def update(character=character, effect=effect):
+                select(character)
+                character.toggle_condition(effect)
+                web.refresh_combat_sections()
+
+            benchmarks[f"render.update[{character.name}]"] = update
+
+            def what_if(character=character, effect=effect, cached=True):
+                # The section is only computed while open.
+                web.app.storage.tab["expansion.What If"] = True
+                try:
+                    select(character)
+                    character.toggle_condition(effect)
+                    if not cached:
+                        whatif._toggle_sheets.clear()
+                    web.render_what_if()
+                finally:
+                    del web.app.storage.tab["expansion.What If"]
+
+            benchmarks[f"render.what_if[{character.name}]"] = what_if
+            benchmarks[f"render.what_if.uncached[{character.name}]"] = (
+                functools.partial(what_if, cached=False)
+            )
+
+    # A GM screen: the party page with ten characters, one of which changes.
+    party = [
+        dataclasses.replace(YOYU.fork(), name=f"{YOYU.name} {i}") for i in range(10)
+    ]
+    web.SESSIONS[stub_ui.TAB_ID] = Session(party)
+    web.render_party()
+    changing = web.get_session().edit(party[0].name)
+    effect = _toggleable(changing)
+
+    def party_update():
+        changing.toggle_condition(effect)
+        web.update_party()
+
+    benchmarks[f"render.party[{len(party)}]"] = web.render_party
+    benchmarks[f"render.party_update[{len(party)}]"] = party_update
+    return benchmarks
+
+
+def collect(name_filter: str | None = None) -> dict[str, Callable[[], object]]:
+    chars = characters()
+    benchmarks = {}
+    for character in chars:
+        benchmarks.update(character_benchmarks(character))
+    benchmarks.update(damage_progression_benchmarks())
+    benchmarks.update(dice_benchmarks())
+    benchmarks.update(render_benchmarks(chars))
+    if name_filter:
+        benchmarks = {k: v for k, v in benchmarks.items() if name_filter in k}
+    return benchmarks
+
+
+def measure(func: Callable[[], object], repeat: int = 5, min_time: float = 0.02):
+    """Returns the best and median seconds per call and the calls per repeat."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        if elapsed == 0:
+            number *= 10
+        else:
+            number = max(number * 2, int(number * min_time / elapsed * 1.2))
+    timings = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return min(timings), statistics.median(timings), number
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short=12", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(name_filter: str | None = None) -> dict:
+    results = {}
+    for name, func in collect(name_filter).items():
+        best, median, number = measure(func)
+        results[name] = {"best": best, "median": median, "number": number}
+        print(f"{name:<60} {best * 1e6:>12.2f}us  (median {median * 1e6:.2f}us)")
+    return {
+        "commit": git_commit(),
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "results": results,
+    }
+
+
+def save(run_results: dict) -> str:
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{run_results['commit']}.json")
+    with open(path, "w") as f:
+        json.dump(run_results, f, indent=2)
+    return path
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> bool:
+    """Prints the change of each benchmark, returning False on a regression."""
+    ok = True
+    print(f"{baseline['commit']} -> {current['commit']}")
+    for name, result in current["results"].items():
+        if name not in baseline["results"]:
+            continue
+        before = baseline["results"][name]["best"]
+        ratio = result["best"] / before if before else 1.0
+        marker = ""
+        if ratio > 1 + threshold:
+            marker = "  SLOWER"
+            ok = False
+        elif ratio < 1 - threshold:
+            marker = "  faster"
+        print(
+            f"{name:<60} {before * 1e6:>10.2f}us -> {result['best'] * 1e6:>10.2f}us "
+            f"({ratio:.2f}x){marker}"
+        )
+    return ok
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.suite")
+    parser.add_argument("-k", dest="name_filter", help="Only run matching names")
+    parser.add_argument("--save", action="store_true", help="Save the results")
+    parser.add_argument(
+        "--compare",
+        nargs="+",
+        metavar="RESULTS",
+        help="Baseline results, and optionally results to compare instead of a run",
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="Allowed slowdown ratio"
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare and len(args.compare) > 2:
+        parser.error("--compare takes a baseline and at most one other result")
+    if args.compare and len(args.compare) == 2:
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+    else:
+        current = run(args.name_filter)
+        if args.save:
+            print(f"Saved {save(current)}")
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        return 0 if compare(baseline, current, args.threshold) else 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
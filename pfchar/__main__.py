@@ -0,0 +1,192 @@
+"""
+Prints a character sheet without starting the web UI, eg,
+
+    python -m pfchar "Yoyu Tekko" --enable "Power Attack" --two-handed
+    python -m pfchar Doramak --status "Bless:attack=1,will=1" --breakdown
+    python -m pfchar Yoyu --file characters.jsonl
+
+Characters are matched by case-insensitive name prefix. Statuses are given as
+NAME:KEY=VALUE,... where keys are attack, damage, size, or the name of a
+statistic, save or AC bonus type. Damage may also be a dice expression, eg,
+"Flame Blade:damage=1d6+2 fire", and type sets the Pathfinder bonus type, eg,
+"Heroism:attack=2,will=2,type=morale", so bonuses of the same type don't stack.
+"""
+
+import argparse
+import sys
+
+from pfchar.char.base import ArmorBonus, BonusType, Save, Statistic
+from pfchar.char.character import Character
+from pfchar.sheet import combat_sections, statistic_labels
+from pfchar.utils import create_status_effect
+from pfchar.whatif import overlay
+
+
+def load_characters(path: str | None) -> list[Character]:
+    if path is None:
+        from pfchar.premade import YOYU, DORAMAK, CHELLYBEAN
+
+        return [YOYU, DORAMAK, CHELLYBEAN]
+
+    from pfchar import serialize
+
+    with open(path) as f:
+        return list(serialize.load(f))
+
+
+def find_character(characters: list[Character], name: str) -> Character:
+    name = name.lower()
+    matches = [c for c in characters if c.name.lower() == name] or [
+        c for c in characters if c.name.lower().startswith(name)
+    ]
+    if len(matches) != 1:
+        names = ", ".join(c.name for c in matches or characters)
+        problem = "Ambiguous" if matches else "Unknown"
+        raise ValueError(f"{problem} character {name!r}, choose from: {names}")
+    return matches[0]
+
+
+def parse_status(text: str):
+    name, _, values = text.partition(":")
+    name = name.strip()
+    if not name:
+        raise ValueError(f"Status has no name: {text!r}")
+    kwargs = {"statistics": {}, "saves": {}, "ac_bonuses": {}}
+    keys = {"attack": "attack_bonus", "damage": "damage_bonus", "size": "size_change"}
+    for entry in filter(None, values.split(",")):
+        key, _, value = entry.partition("=")
+        key = key.strip().lower()
+        if key == "type":
+            member = next(
+                (m for m in BonusType if m.value.lower() == value.strip().lower()), None
+            )
+            if member is None:
+                raise ValueError(
+                    f"Unknown bonus type {value!r}, choose from: "
+                    + ", ".join(m.value for m in BonusType)
+                )
+            kwargs["bonus_type"] = member
+            continue
+        try:
+            value = int(value)
+        except ValueError:
+            if key == "damage":
+                kwargs["damage_dice"] = value
+                continue
+            raise ValueError(f"Invalid value for {key!r}: {value!r}") from None
+        for group, enum_class in (
+            ("statistics", Statistic),
+            ("saves", Save),
+            ("ac_bonuses", ArmorBonus),
+        ):
+            member = next((m for m in enum_class if m.value.lower() == key), None)
+            if member is not None:
+                kwargs[group][member] = value
+                break
+        else:
+            if key not in keys:
+                raise ValueError(f"Unknown status value {key!r} in {text!r}")
+            kwargs[keys[key]] = value
+    return create_status_effect(name, **kwargs)
+
+
+def apply_arguments(character: Character, args: argparse.Namespace) -> Character:
+    toggles = {name: True for name in args.enable}
+    toggles.update({name: False for name in args.disable})
+    return overlay(
+        character,
+        statuses=[parse_status(text) for text in args.status],
+        toggles=toggles,
+        two_handed=args.two_handed,
+        remove=args.remove_status,
+    )
+
+
+def format_sheet(character: Character, breakdown: bool = False) -> str:
+    sheet = character.snapshot()
+    lines = [character.name, ""]
+    lines.extend(statistic_labels(character, sheet).values())
+    lines.append("")
+    toggleable = [
+        effect
+        for effect in character.all_effects()
+        if hasattr(effect.condition, "toggle")
+    ]
+    if character.can_be_two_handed():
+        lines.append(f"[{'x' if character.is_two_handed() else ' '}] Two Handed")
+    for effect in toggleable:
+        lines.append(f"[{'x' if effect.condition.enabled else ' '}] {effect.name}")
+    if character.statuses:
+        lines.append("Statuses: " + ", ".join(s.name for s in character.statuses))
+    lines.append("")
+    for title, details in combat_sections(sheet).values():
+        lines.append(title)
+        if breakdown:
+            lines.extend(f"    {detail}" for detail in details)
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m pfchar", description="Prints a character sheet."
+    )
+    parser.add_argument("character", nargs="?", help="Character name or prefix")
+    parser.add_argument("--file", help="JSON Lines file of characters to load")
+    parser.add_argument(
+        "--list", action="store_true", help="List the available characters"
+    )
+    parser.add_argument(
+        "--enable", action="append", default=[], metavar="NAME", help="Enable toggle"
+    )
+    parser.add_argument(
+        "--disable", action="append", default=[], metavar="NAME", help="Disable toggle"
+    )
+    parser.add_argument(
+        "--two-handed", action=argparse.BooleanOptionalAction, default=None
+    )
+    parser.add_argument(
+        "--status",
+        action="append",
+        default=[],
+        metavar="NAME:KEY=VALUE,...",
+        help="Add a status, eg, 'Bless:attack=1' or 'Bull:strength=4'",
+    )
+    parser.add_argument(
+        "--remove-status", action="append", default=[], metavar="NAME"
+    )
+    parser.add_argument(
+        "--breakdown", action="store_true", help="Show what each value is made of"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print the time spent in each effect hook to stderr",
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        characters = load_characters(args.file)
+        if args.list or args.character is None:
+            print("\n".join(c.name for c in characters))
+            return 0
+        character = find_character(characters, args.character)
+        character = apply_arguments(character, args)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    if not args.profile:
+        print(format_sheet(character, breakdown=args.breakdown))
+        return 0
+
+    from pfchar.profiling import Profiler
+
+    # Forks carry over cached values, so make sure everything is computed.
+    character.invalidate()
+    with Profiler() as profiler:
+        print(format_sheet(character, breakdown=args.breakdown))
+    print(profiler.format(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+"""
+JSON API for computed character sheets, served alongside the UI.
+
+    GET /api/characters
+    GET /api/characters/{name}?enable=Power Attack&disable=...&two_handed=true
+
+Toggles are given by effect name and applied over the character's defaults.
+Responses carry an ETag derived from the character definition and the toggle
+state, so a client polling with If-None-Match gets a 304 without the sheet
+being recomputed, and bodies for recently requested states are kept encoded.
+"""
+
+import collections
+import hashlib
+import json
+from typing import Iterable
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+
+from pfchar.char.base import CriticalBonus, Dice
+from pfchar.char.character import Character, Snapshot
+from pfchar import serialize, utils
+
+MAX_CACHED_RESPONSES = 256
+
+
+def dice_to_json(dice: Dice) -> dict:
+    return {
+        "num": dice.num,
+        "sides": dice.sides,
+        "modifier": dice.modifier,
+        "type": dice.type,
+    }
+
+
+def critical_to_json(critical: CriticalBonus) -> dict:
+    return {
+        "range": critical.crit_range,
+        "multiplier": critical.crit_multiplier,
+        "damage": [dice_to_json(d) for d in critical.damage_bonus],
+        "text": utils.crit_to_string(critical),
+    }
+
+
+def sheet_to_json(character: Character, sheet: Snapshot) -> dict:
+    return {
+        "name": character.name,
+        "size": sheet.size.name,
+        "weapon": sheet.weapon,
+        "two_handed": sheet.two_handed,
+        "toggles": {
+            effect.name: effect.condition.enabled
+            for effect in character.all_effects()
+            if hasattr(effect.condition, "toggle")
+        },
+        "statistics": dict(sheet.statistics),
+        "attack": {
+            "bonuses": dict(sheet.attack),
+            "attacks": utils.iterative_attacks(sheet.attack),
+            "text": sheet.attack_string,
+        },
+        "damage": {
+            "bonuses": {
+                name: [dice_to_json(d) for d in dice]
+                for name, dice in sheet.damage.items()
+            },
+            "text": sheet.damage_string,
+        },
+        "critical": critical_to_json(sheet.critical),
+        "armour_class": {
+            "bonuses": dict(sheet.armour),
+            "total": sheet.total_ac,
+            "touch": sheet.touch_ac,
+            "flat_footed": sheet.flat_footed_ac,
+            "dex_capped": sheet.dex_capped,
+        },
+        "cmb": {"bonuses": dict(sheet.cmb), "total": sheet.cmb_total},
+        "cmd": {"bonuses": dict(sheet.cmd), "total": sheet.cmd_total},
+        "saves": {
+            save: {"bonuses": dict(bonuses), "total": sum(bonuses.values())}
+            for save, bonuses in sheet.saves.items()
+        },
+        "hp_offset": sheet.hp_offset,
+    }
+
+
+def create_router(characters: Iterable[Character]) -> APIRouter:
+    """Serves the given character definitions, which must not be modified."""
+    router = APIRouter(prefix="/api")
+    characters_by_name = {c.name: c for c in characters}
+    # Definitions are fixed, so each is only hashed once.
+    digests: dict[str, str] = {}
+    responses: collections.OrderedDict[str, bytes] = collections.OrderedDict()
+
+    def get_definition(name: str) -> Character:
+        try:
+            return characters_by_name[name]
+        except KeyError:
+            raise HTTPException(404, f"Unknown character: {name}") from None
+
+    def requested_state(
+        character: Character,
+        enable: list[str],
+        disable: list[str],
+        two_handed: bool | None,
+    ) -> tuple[tuple[bool, ...], bool]:
+        toggleable = [
+            effect
+            for effect in character.all_effects()
+            if hasattr(effect.condition, "toggle")
+        ]
+        unknown = set(enable).union(disable).difference(e.name for e in toggleable)
+        if unknown:
+            raise HTTPException(400, f"Unknown toggles: {', '.join(sorted(unknown))}")
+        flags = tuple(
+            (effect.condition.enabled or effect.name in enable)
+            and effect.name not in disable
+            for effect in toggleable
+        )
+        if two_handed is None:
+            two_handed = character.is_two_handed()
+        elif two_handed and not character.can_be_two_handed():
+            raise HTTPException(400, f"{character.name} can't wield two handed")
+        return flags, two_handed
+
+    def etag(character: Character, flags: tuple[bool, ...], two_handed: bool) -> str:
+        if character.name not in digests:
+            digests[character.name] = hashlib.sha1(
+                serialize.dumps(character).encode()
+            ).hexdigest()
+        state = f"{digests[character.name]}:{two_handed:d}:"
+        state += "".join("1" if flag else "0" for flag in flags)
+        return f'"{hashlib.sha1(state.encode()).hexdigest()[:20]}"'
+
+    def render(character: Character, flags: tuple[bool, ...], two_handed: bool):
+        character = character.fork()
+        toggleable = [
+            effect
+            for effect in character.all_effects()
+            if hasattr(effect.condition, "toggle")
+        ]
+        for effect, enabled in zip(toggleable, flags):
+            if effect.condition.enabled != enabled:
+                character.toggle_condition(effect)
+        if character.is_two_handed() != two_handed:
+            character.toggle_two_handed()
+        body = sheet_to_json(character, character.snapshot())
+        return json.dumps(body, separators=(",", ":")).encode()
+
+    # Async so requests run on the event loop, sharing the caches without locks.
+    @router.get("/characters")
+    async def list_characters() -> list[str]:
+        return list(characters_by_name)
+
+    @router.get("/characters/{name}")
+    async def get_sheet(
+        name: str,
+        request: Request,
+        enable: list[str] = Query(default=[]),
+        disable: list[str] = Query(default=[]),
+        two_handed: bool | None = None,
+    ) -> Response:
+        character = get_definition(name)
+        flags, two_handed = requested_state(character, enable, disable, two_handed)
+        tag = etag(character, flags, two_handed)
+        # Clients must revalidate, which is cheap as it never computes a sheet.
+        headers = {"ETag": tag, "Cache-Control": "no-cache"}
+        if tag in request.headers.get("if-none-match", ""):
+            return Response(status_code=304, headers=headers)
+        if tag in responses:
+            responses.move_to_end(tag)
+        else:
+            responses[tag] = render(character, flags, two_handed)
+            if len(responses) > MAX_CACHED_RESPONSES:
+                responses.popitem(last=False)
+        return Response(responses[tag], media_type="application/json", headers=headers)
+
+    return router
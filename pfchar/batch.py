@@ -0,0 +1,287 @@
+"""
+Batch damage analysis of a roster of characters, in every toggle state, against
+a sweep of target ACs, spread over a process pool.
+
+    python -m pfchar.batch --file characters.jsonl --ac 20 45 --rounds 100000
+
+Characters are reduced in the parent process to a Case per distinct set of
+numbers (toggle states which don't change attack or damage share a case), which
+pickles to a few hundred bytes. Workers receive every case once, when they
+start, then simulate chunks of (case, AC, piece) units and return a damage
+histogram per case and AC, which are merged into the results. Each piece has
+its own seed derived from the unit, so results don't depend on the number of
+workers or how the units are chunked.
+"""
+
+import argparse
+import collections
+import concurrent.futures
+import dataclasses
+import operator
+import os
+import random
+import sys
+import time
+from typing import TYPE_CHECKING, Iterable, Mapping, Sequence
+
+from pfchar import optimize, probability, utils
+from pfchar.char.base import CriticalBonus, Dice
+from pfchar.simulate import CRITICAL, HIT, SimulationResult, Simulator, summarise
+
+if TYPE_CHECKING:
+    from pfchar.char.character import Character
+
+# Rounds simulated by one unit of work, so a single case and AC can still be
+# spread over several workers.
+PIECE_ROUNDS = 50_000
+# Chunks per worker, so a slow chunk doesn't leave the other workers idle.
+CHUNKS_PER_WORKER = 4
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Case:
+    """
+    A character in one or more toggle states with the same numbers. Has the
+    fields of a Snapshot which damage depends on, so it can be simulated and
+    passed to the probability functions in place of one.
+    """
+
+    character: str
+    # {toggle name: enabled} of each state, for toggles which change damage.
+    states: tuple[Mapping[str, bool], ...]
+    attack: Mapping[str, int]
+    damage: Mapping[str, tuple[Dice, ...]]
+    critical: CriticalBonus
+    weapon: str | None
+
+    @property
+    def label(self) -> str:
+        enabled = [name for name, on in self.states[0].items() if on]
+        label = ", ".join(enabled) or "no toggles"
+        if len(self.states) > 1:
+            label += f" (+{len(self.states) - 1} equivalent)"
+        return label
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class BatchResult:
+    case: Case
+    armour_class: int
+    expected_damage: float
+    simulation: SimulationResult
+
+
+def character_cases(character: "Character") -> list[Case]:
+    """Returns a case per distinct attack and damage profile of the character."""
+    character = character.fork()
+    toggles = optimize.relevant_toggles(character, optimize.get_toggles(character))
+    cases: dict[tuple, Case] = {}
+    for flip in [None, *optimize.gray_code_flips(len(toggles))]:
+        if flip is not None:
+            toggles[flip].toggle()
+        state = {toggle.name: toggle.is_enabled() for toggle in toggles}
+        key = optimize.profile_key(character)
+        if key in cases:
+            case = cases[key]
+            cases[key] = dataclasses.replace(case, states=case.states + (state,))
+            continue
+        sheet = character.snapshot()
+        cases[key] = Case(
+            character=character.name,
+            states=(state,),
+            attack=dict(sheet.attack),
+            damage=dict(sheet.damage),
+            critical=sheet.critical,
+            weapon=sheet.weapon,
+        )
+    return list(cases.values())
+
+
+def _piece_seed(seed: int, case: int, armour_class: int, piece: int) -> str:
+    return f"{seed}/{case}/{armour_class}/{piece}"
+
+
+def _run_chunk(
+    cases: Sequence[Case], units: Sequence[tuple[int, int, int, int]], seed: int
+) -> dict[tuple[int, int], tuple[collections.Counter, list[int]]]:
+    """
+    Simulates (case, AC, piece, rounds) units, returning the damage histogram
+    and outcome counts of each case and AC.
+    """
+    simulators: dict[tuple[int, int], Simulator] = {}
+    merged: dict[tuple[int, int], tuple[collections.Counter, list[int]]] = {}
+    for case, armour_class, piece, rounds in units:
+        key = (case, armour_class)
+        if key not in simulators:
+            simulators[key] = Simulator(cases[case], armour_class)
+            merged[key] = (collections.Counter(), [0, 0, 0])
+        rng = random.Random(_piece_seed(seed, case, armour_class, piece))
+        totals, counts = simulators[key].roll(rounds, rng)
+        histogram, outcome_counts = merged[key]
+        histogram.update(totals)
+        outcome_counts[:] = map(operator.add, outcome_counts, counts)
+    return merged
+
+
+# Set in each worker process by _initialise_worker.
+_worker_cases: Sequence[Case] = ()
+
+
+def _initialise_worker(cases: Sequence[Case]):
+    global _worker_cases
+    _worker_cases = cases
+
+
+def _run_worker_chunk(
+    units: Sequence[tuple[int, int, int, int]], seed: int
+) -> dict[tuple[int, int], tuple[collections.Counter, list[int]]]:
+    return _run_chunk(_worker_cases, units, seed)
+
+
+def _chunks(units: list, count: int) -> list[list]:
+    # Contiguous, so a chunk mostly covers one case and AC.
+    size, remainder = divmod(len(units), count)
+    chunks = []
+    start = 0
+    for i in range(count):
+        end = start + size + (i < remainder)
+        if end > start:
+            chunks.append(units[start:end])
+        start = end
+    return chunks
+
+
+def analyse(
+    characters: Iterable["Character"],
+    armour_classes: Iterable[int],
+    rounds: int = 100_000,
+    workers: int | None = None,
+    seed: int | None = None,
+) -> list[BatchResult]:
+    """
+    Simulates ``rounds`` full attacks of every case of every character against
+    each AC, using ``workers`` processes (every CPU if None). With a single
+    worker everything runs in this process.
+    """
+    cases = [case for character in characters for case in character_cases(character)]
+    armour_classes = sorted(set(armour_classes))
+    workers = workers or os.cpu_count() or 1
+    if seed is None:
+        seed = random.randrange(2**32)
+
+    units = []
+    for case in range(len(cases)):
+        for armour_class in armour_classes:
+            for piece, start in enumerate(range(0, rounds, PIECE_ROUNDS)):
+                units.append(
+                    (case, armour_class, piece, min(PIECE_ROUNDS, rounds - start))
+                )
+
+    if workers == 1:
+        chunk_results = [_run_chunk(cases, units, seed)]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_initialise_worker,
+            initargs=(cases,),
+        ) as executor:
+            futures = [
+                executor.submit(_run_worker_chunk, chunk, seed)
+                for chunk in _chunks(units, workers * CHUNKS_PER_WORKER)
+            ]
+            chunk_results = [future.result() for future in futures]
+
+    merged: dict[tuple[int, int], tuple[collections.Counter, list[int]]] = {}
+    for chunk_result in chunk_results:
+        for key, (histogram, counts) in chunk_result.items():
+            if key not in merged:
+                merged[key] = (collections.Counter(), [0, 0, 0])
+            merged[key][0].update(histogram)
+            merged[key][1][:] = map(operator.add, merged[key][1], counts)
+
+    results = []
+    for case_index, case in enumerate(cases):
+        attacks = len(utils.iterative_attacks(case.attack))
+        for armour_class in armour_classes:
+            histogram, counts = merged.get(
+                (case_index, armour_class), (collections.Counter(), [0, 0, 0])
+            )
+            results.append(
+                BatchResult(
+                    case=case,
+                    armour_class=armour_class,
+                    expected_damage=probability.expected_damage(case, armour_class),
+                    simulation=summarise(
+                        histogram,
+                        rounds=rounds,
+                        attacks=rounds * attacks,
+                        hits=counts[HIT] + counts[CRITICAL],
+                        criticals=counts[CRITICAL],
+                    ),
+                )
+            )
+    return results
+
+
+def format_results(results: list[BatchResult]) -> str:
+    lines = []
+    case = None
+    for result in results:
+        if result.case is not case:
+            case = result.case
+            lines.append(f"{case.character}: {case.label}")
+        simulation = result.simulation
+        percentiles = ", ".join(
+            f"p{percentile} {value}"
+            for percentile, value in simulation.percentiles.items()
+        )
+        lines.append(
+            f"    AC {result.armour_class}: expected {result.expected_damage:.2f}, "
+            f"simulated {simulation.mean:.2f}, hit rate {simulation.hit_rate:.3f}"
+            + (f" ({percentiles})" if percentiles else "")
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    from pfchar.__main__ import load_characters
+    from pfchar.premade import YOYU, DORAMAK, CHELLYBEAN
+
+    parser = argparse.ArgumentParser(
+        prog="python -m pfchar.batch",
+        description="Simulates every toggle state of a roster against a sweep of ACs.",
+    )
+    parser.add_argument(
+        "--file", help="JSON Lines file of characters to add to the premade ones"
+    )
+    parser.add_argument(
+        "--ac", nargs=2, type=int, default=(20, 45), metavar=("MIN", "MAX")
+    )
+    parser.add_argument("--rounds", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, help="Processes, every CPU if unset")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    try:
+        characters = [YOYU, DORAMAK, CHELLYBEAN]
+        if args.file:
+            characters += load_characters(args.file)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    start = time.perf_counter()
+    results = analyse(
+        characters,
+        range(args.ac[0], args.ac[1] + 1),
+        rounds=args.rounds,
+        workers=args.workers,
+        seed=args.seed,
+    )
+    elapsed = time.perf_counter() - start
+    print(format_results(results))
+    print(f"{len(results)} results in {elapsed:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,13 +8,15 @@ if TYPE_CHECKING:
     from pfchar.char.character import Character
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Ability(Effect):
     pass
 
 
 @dataclasses.dataclass
 class DeadlyCritical(Ability):
+    __slots__ = ()
+
     def __init__(self, weapon_type: WeaponType):
         super().__init__(name="Deadly Critical")
         self.condition = WeaponTypeCondition(weapon_type)
@@ -31,6 +33,8 @@ class DeadlyCritical(Ability):
 
 @dataclasses.dataclass
 class WeaponsMastery(Ability):
+    __slots__ = ()
+
     def __init__(self, weapon_type: WeaponType):
         super().__init__(name="Weapons Mastery")
         self.condition = WeaponTypeCondition(weapon_type)
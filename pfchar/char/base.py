@@ -1,5 +1,6 @@
 import dataclasses
 import enum
+import functools
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -54,6 +55,27 @@ class ArmorBonus(enum.StrEnum):
     PENALTY = "Penalty"
 
 
+class BonusType(enum.StrEnum):
+    """Types of bonus to attack, damage, saves and statistics."""
+
+    ALCHEMICAL = "Alchemical"
+    CIRCUMSTANCE = "Circumstance"
+    COMPETENCE = "Competence"
+    DODGE = "Dodge"
+    ENHANCEMENT = "Enhancement"
+    INHERENT = "Inherent"
+    INSIGHT = "Insight"
+    LUCK = "Luck"
+    MORALE = "Morale"
+    PROFANE = "Profane"
+    RACIAL = "Racial"
+    RESISTANCE = "Resistance"
+    SACRED = "Sacred"
+    SIZE = "Size"
+    TRAIT = "Trait"
+    UNTYPED = "Untyped"
+
+
 class Size(enum.Enum):
     FINE = -8
     DIMINUTIVE = -4
@@ -66,51 +88,119 @@ class Size(enum.Enum):
     COLOSSAL = 8
 
 
+class Contribution(enum.StrEnum):
+    ATTACK = "Attack"
+    DAMAGE = "Damage"
+    CRITICAL = "Critical"
+    ARMOUR_CLASS = "Armour Class"
+    SAVES = "Saves"
+    STATISTICS = "Statistics"
+    SIZE = "Size"
+
+
 def stat_modifier(value: int) -> int:
     return (value - 10) // 2
 
 
-@dataclasses.dataclass(eq=True, frozen=True)
+@dataclasses.dataclass(eq=True, frozen=True, slots=True)
 class Dice:
     num: int
     sides: int = 1
     modifier: int = 0
-    # type
+    # Damage type or qualifier, eg, "fire" or "vs undead", None if untyped.
+    type: str | None = None
+
+    # Typed, so a float from the UI can't stand in for an equal int.
+    @classmethod
+    @functools.lru_cache(maxsize=4096, typed=True)
+    def of(
+        cls, num: int, sides: int = 1, modifier: int = 0, type: str | None = None
+    ) -> "Dice":
+        """Returns a shared instance, for dice built on every query."""
+        return cls(num, sides, modifier, type)
 
     def is_variable(self) -> bool:
         return self.sides > 1
 
 
 class Condition:
+    __slots__ = ()
+
     def __call__(self, character: "Character") -> bool:
         raise NotImplementedError
 
 
 class NullCondition(Condition):
+    __slots__ = ()
+
     def __call__(self, character: "Character") -> bool:
         return True
 
 
-@dataclasses.dataclass(frozen=True)
+@dataclasses.dataclass(frozen=True, slots=True)
 class CriticalBonus:
     crit_range: int = 20
     crit_multiplier: int = 2
-    damage_bonus: list[Dice] = dataclasses.field(default_factory=list)
+    damage_bonus: tuple[Dice, ...] = ()
+
+
+@functools.cache
+def _overridden_contributions(cls: type["Effect"]) -> frozenset[Contribution]:
+    def overrides(method: str) -> bool:
+        return getattr(cls, method) is not getattr(Effect, method)
+
+    contributions = {
+        contribution
+        for contribution, method in (
+            (Contribution.ATTACK, "attack_bonus"),
+            (Contribution.DAMAGE, "damage_bonus"),
+            (Contribution.CRITICAL, "critical_bonus"),
+            (Contribution.ARMOUR_CLASS, "armour_class_bonus"),
+            (Contribution.SAVES, "saves_bonuses"),
+            (Contribution.STATISTICS, "statistic_bonus"),
+            (Contribution.SIZE, "size_change"),
+        )
+        if overrides(method)
+    }
+    # Statistic bonuses also change attack and damage, see Character.
+    if Contribution.STATISTICS in contributions:
+        contributions |= {Contribution.ATTACK, Contribution.DAMAGE}
+    if hasattr(cls, "max_dex_bonus"):
+        contributions.add(Contribution.ARMOUR_CLASS)
+    return frozenset(contributions)
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Effect:
     name: str
     condition: Condition = dataclasses.field(default_factory=NullCondition)
 
+    def contributions(self) -> frozenset[Contribution]:
+        """
+        The parts of a character sheet this effect can change, used to skip
+        effects which would only ever return 0 or nothing for a query.
+        """
+        return _overridden_contributions(type(self))
+
+    def bonus_type(self) -> BonusType:
+        """
+        The type of this effect's bonuses to attack, damage, saves and
+        statistics, which decides whether they stack with other effects.
+        """
+        return BonusType.UNTYPED
+
     def statistic_bonus(self, character: "Character", statistic: Statistic) -> int:
         return 0
 
     def statistic_modifier_bonus(
         self, character: "Character", statistic: Statistic, mult: float = 1.0
     ) -> int:
+        """
+        The change to the statistic's modifier from this effect's bonus, if it
+        applies after stacking.
+        """
         original = character.statistics.get(statistic, 10)
-        modified = original + self.statistic_bonus(character, statistic)
+        modified = original + character.applied_statistic_bonus(self, statistic)
         return int((stat_modifier(modified) * mult) - (stat_modifier(original) * mult))
 
     def critical_bonus(
@@ -118,18 +208,12 @@ class Effect:
     ) -> CriticalBonus:
         return critical_bonus
 
+    # Attack and damage from statistic bonuses are added by the Character, as
+    # they depend on which statistic bonuses apply after stacking.
     def attack_bonus(self, character: "Character") -> int:
-        statistic = character.attack_statistic()
-        return self.statistic_modifier_bonus(character, statistic)
+        return 0
 
     def damage_bonus(self, character: "Character") -> list[Dice]:
-        bonus = self.statistic_modifier_bonus(
-            character,
-            Statistic.STRENGTH,
-            mult=1.5 if character.is_two_handed() else 1.0,
-        )
-        if bonus:
-            return [Dice(bonus)]
         return []
 
     def armour_class_bonus(self, character: "Character") -> dict[ArmorBonus, int]:
@@ -0,0 +1,143 @@
+"""
+Pathfinder bonus stacking: bonuses of the same type don't stack, only the
+highest applies, except for dodge, circumstance and untyped bonuses, which
+always stack. Penalties always stack.
+
+A BonusResolver holds the bonuses of every source (effect) for every target
+(eg, attack, a save or a statistic). Non-stacking bonuses are kept in a max-heap
+per target and type, so adding, removing or changing one source is O(log n)
+rather than a rescan of every effect. Removed entries are left in the heaps and
+skipped once they reach the top.
+"""
+
+import heapq
+from typing import Hashable, Iterator
+
+from pfchar.char.base import BonusType
+
+STACKING_TYPES = frozenset(
+    {BonusType.UNTYPED, BonusType.DODGE, BonusType.CIRCUMSTANCE}
+)
+# Heaps are rebuilt without removed entries once mostly made of them.
+_COMPACT_MIN_SIZE = 16
+
+
+def stacks(bonus_type: BonusType, value: int) -> bool:
+    return value < 0 or bonus_type in STACKING_TYPES
+
+
+class BonusResolver:
+    def __init__(self):
+        # (source, target) -> (bonus type, value, generation)
+        self._entries: dict[tuple, tuple[BonusType, int, int]] = {}
+        # target -> sources with a bonus to it, and the reverse.
+        self._sources: dict[Hashable, dict[Hashable, None]] = {}
+        self._targets: dict[Hashable, dict[Hashable, None]] = {}
+        # (target, type) -> heap of (-value, order, generation, source)
+        self._heaps: dict[tuple[Hashable, BonusType], list[tuple]] = {}
+        self._totals: dict[Hashable, int] = {}
+        self._order: dict[Hashable, object] = {}
+        self._generation = 0
+
+    def add(
+        self,
+        source: Hashable,
+        target: Hashable,
+        bonus_type: BonusType,
+        value: int,
+        order,
+    ):
+        """
+        Adds (or replaces) the bonus of ``source`` to ``target``. Sources are
+        listed by ``order``, which is kept until the source is removed, and
+        which also breaks ties between equal bonuses of the same type.
+        """
+        if (source, target) in self._entries:
+            self.discard(source, target)
+        if not value:
+            return
+        order = self._order.setdefault(source, order)
+        self._generation += 1
+        self._entries[source, target] = (bonus_type, value, self._generation)
+        self._sources.setdefault(target, {})[source] = None
+        self._targets.setdefault(source, {})[target] = None
+        if stacks(bonus_type, value):
+            self._totals[target] = self._totals.get(target, 0) + value
+            return
+        heap = self._heaps.setdefault((target, bonus_type), [])
+        previous = -heap[0][0] if heap else 0
+        heapq.heappush(heap, (-value, order, self._generation, source))
+        if value > previous:
+            self._totals[target] = self._totals.get(target, 0) + value - previous
+
+    def discard(self, source: Hashable, target: Hashable):
+        entry = self._entries.pop((source, target), None)
+        if entry is None:
+            return
+        bonus_type, value, generation = entry
+        del self._sources[target][source]
+        del self._targets[source][target]
+        if stacks(bonus_type, value):
+            self._totals[target] -= value
+            return
+        heap = self._heaps[target, bonus_type]
+        if heap[0][2] != generation:
+            # Not the applied bonus, so it's only dropped once it reaches the top.
+            self._compact(target, bonus_type)
+            return
+        heapq.heappop(heap)
+        self._prune(target, bonus_type)
+        replacement = -heap[0][0] if heap else 0
+        self._totals[target] += replacement - value
+
+    def discard_source(self, source: Hashable):
+        """Discards every bonus of ``source``, keeping its order."""
+        for target in list(self._targets.get(source, ())):
+            self.discard(source, target)
+
+    def remove(self, source: Hashable):
+        """Discards every bonus of ``source`` and forgets it entirely."""
+        self.discard_source(source)
+        self._targets.pop(source, None)
+        self._order.pop(source, None)
+
+    def _is_live(self, item: tuple, target: Hashable) -> bool:
+        entry = self._entries.get((item[3], target))
+        return entry is not None and entry[2] == item[2]
+
+    def _prune(self, target: Hashable, bonus_type: BonusType):
+        heap = self._heaps[target, bonus_type]
+        while heap and not self._is_live(heap[0], target):
+            heapq.heappop(heap)
+
+    def _compact(self, target: Hashable, bonus_type: BonusType):
+        heap = self._heaps[target, bonus_type]
+        if len(heap) < _COMPACT_MIN_SIZE:
+            return
+        live = [item for item in heap if self._is_live(item, target)]
+        if len(live) * 2 < len(heap):
+            heapq.heapify(live)
+            self._heaps[target, bonus_type] = live
+
+    def total(self, target: Hashable) -> int:
+        return self._totals.get(target, 0)
+
+    def applied(self, source: Hashable, target: Hashable) -> int:
+        """The part of the bonus of ``source`` to ``target`` which applies."""
+        entry = self._entries.get((source, target))
+        if entry is None:
+            return 0
+        bonus_type, value, generation = entry
+        if stacks(bonus_type, value):
+            return value
+        return value if self._heaps[target, bonus_type][0][2] == generation else 0
+
+    def sources(self, target: Hashable) -> list[Hashable]:
+        """Sources with a bonus to ``target``, applied or not, in order."""
+        return sorted(self._sources.get(target, ()), key=self._order.__getitem__)
+
+    def breakdown(self, target: Hashable) -> Iterator[tuple[Hashable, int]]:
+        """Yields each source and its applied bonus to ``target``, in order."""
+        for source in self.sources(target):
+            if value := self.applied(source, target):
+                yield source, value
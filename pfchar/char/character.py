@@ -1,9 +1,16 @@
+import copy
 import dataclasses
+import enum
+import functools
+import types
+from typing import Mapping
 
 from pfchar.char.base import (
     BAB_KEY,
     stat_modifier,
     ArmorBonus,
+    BonusType,
+    Contribution,
     CriticalBonus,
     Dice,
     Effect,
@@ -11,9 +18,151 @@ from pfchar.char.base import (
     Size,
     Statistic,
 )
+from pfchar.char.bonuses import BonusResolver
+from pfchar.char.compiled import CompiledCharacter
 from pfchar.char.feats import Feat, WeaponFinesse
 from pfchar.char.items import Item, Weapon
 from pfchar.char.abilities import Ability
+from pfchar import utils
+
+WEAPON_ENCHANTMENT_KEY = "Weapon Enchantment"
+
+
+class Dependency(enum.StrEnum):
+    # Effects added or removed, or base statistics/equipment changed. Queries
+    # reading effects through what they contribute to depend on those
+    # Contributions instead, so adding an effect only drops the cached values
+    # it can change.
+    EFFECTS = "Effects"
+    # Toggleable conditions enabled or disabled.
+    CONDITIONS = "Conditions"
+    TWO_HANDED = "Two Handed"
+
+
+def cached(*dependencies: Dependency | Contribution):
+    """
+    Caches the result of a Character query until one of its dependencies is
+    invalidated. Cached values are shared between calls and must not be mutated.
+    """
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self: "Character", *args):
+            key = (func.__name__, *args)
+            try:
+                return self._cache[key][0]
+            except KeyError:
+                value = func(self, *args)
+                self._cache[key] = (value, dependencies)
+                return value
+
+        return wrapper
+
+    return decorator
+
+
+class _EffectBonuses:
+    """
+    The typed bonuses of a character's effects, kept up to date as effects are
+    added, removed and toggled instead of being recomputed from every effect.
+    Effects are keyed by id, and ordered as in Character.all_effects().
+    """
+
+    __slots__ = (
+        "resolver",
+        "effects",
+        "orders",
+        "dice",
+        "conditions",
+        "two_handed",
+        "_count",
+    )
+
+    def __init__(self, two_handed: bool):
+        self.resolver = BonusResolver()
+        self.effects: dict[int, Effect] = {}
+        self.orders: dict[int, tuple[int, int]] = {}
+        # Variable damage dice of enabled effects, which always apply.
+        self.dice: dict[int, tuple[Dice, ...]] = {}
+        # Condition id -> the effects using it, as a condition may be shared.
+        self.conditions: dict[int, list[int]] = {}
+        # The two-handed state damage bonuses were computed in, None if mixed.
+        self.two_handed: bool | None = two_handed
+        self._count = 0
+
+    def track(self, effect: Effect, rank: int) -> bool:
+        """Returns False if the effect is already tracked."""
+        key = id(effect)
+        if key in self.effects:
+            return False
+        self.effects[key] = effect
+        self.orders[key] = (rank, self._count)
+        self._count += 1
+        self.conditions.setdefault(id(effect.condition), []).append(key)
+        return True
+
+    def untrack(self, effect: Effect):
+        key = id(effect)
+        if self.effects.pop(key, None) is None:
+            return
+        del self.orders[key]
+        self.dice.pop(key, None)
+        self.conditions[id(effect.condition)].remove(key)
+        self.resolver.remove(key)
+
+    def sources(self, *targets, dice: bool = False) -> list[Effect]:
+        """Effects with a bonus to any of the targets, in order."""
+        keys = set(self.dice) if dice else set()
+        for target in targets:
+            keys.update(self.resolver.sources(target))
+        return [self.effects[key] for key in sorted(keys, key=self.orders.__getitem__)]
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Snapshot:
+    """Immutable view of every computed value on a character sheet."""
+
+    size: Size
+    weapon: str | None
+    two_handed: bool
+    statistics: Mapping[Statistic, int]
+    attack: Mapping[str, int]
+    damage: Mapping[str, tuple[Dice, ...]]
+    critical: CriticalBonus
+    armour: Mapping[ArmorBonus, int]
+    dex_capped: bool
+    cmb: Mapping[str, int]
+    cmd: Mapping[str, int]
+    saves: Mapping[Save, Mapping[str, int]]
+    hp_offset: int
+
+    @property
+    def attack_string(self) -> str:
+        return utils.to_attack_string(self.attack)
+
+    @property
+    def damage_string(self) -> str:
+        return utils.sum_up_modifiers(self.damage)
+
+    @property
+    def total_ac(self) -> int:
+        return utils.get_total_ac(self.armour)
+
+    @property
+    def touch_ac(self) -> int:
+        return utils.get_touch_ac(self.armour)
+
+    @property
+    def flat_footed_ac(self) -> int:
+        return utils.get_flat_footed_ac(self.armour)
+
+    @property
+    def cmb_total(self) -> int:
+        return sum(self.cmb.values())
+
+    @property
+    def cmd_total(self) -> int:
+        return sum(self.cmd.values())
 
 
 @dataclasses.dataclass
@@ -40,10 +189,139 @@ class Character:
     abilities: list[Ability] = dataclasses.field(default_factory=list)
     statuses: list[Effect] = dataclasses.field(default_factory=list)
     _two_handed: bool = False
+    _cache: dict[tuple, tuple[object, tuple[Dependency, ...]]] = dataclasses.field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+    # Built on first use, then maintained by the methods changing effects.
+    _bonuses: _EffectBonuses | None = dataclasses.field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    def __getstate__(self) -> dict:
+        # Cached values and the resolver refer to this character's effects, so
+        # copies and pickles start without them.
+        state = self.__dict__.copy()
+        state["_cache"] = {}
+        state["_bonuses"] = None
+        return state
+
+    def invalidate(self, *dependencies: Dependency):
+        """
+        Drops cached values depending on any of the given dependencies, or all
+        cached values if none are given. Dependency.EFFECTS includes everything
+        computed from effects. Must be called after mutating the character
+        directly rather than through its methods.
+        """
+        self._bonuses = None
+        if Dependency.EFFECTS in dependencies:
+            dependencies += tuple(Contribution)
+        self._invalidate_cache(*dependencies)
+
+    def _invalidate_cache(self, *dependencies: Dependency | Contribution):
+        if not dependencies:
+            self._cache.clear()
+            return
+        self._cache = {
+            key: entry
+            for key, entry in self._cache.items()
+            if not any(dependency in entry[1] for dependency in dependencies)
+        }
+
+    def add_status(self, status: Effect):
+        self.statuses.append(status)
+        if self._bonuses is not None:
+            self._add_bonuses(status, rank=2)
+        self._invalidate_cache(Dependency.EFFECTS, *status.contributions())
+
+    def add_item(self, item: Effect):
+        self.items.append(item)
+        if self._bonuses is not None:
+            self._add_bonuses(item, rank=3)
+        self._invalidate_cache(Dependency.EFFECTS, *item.contributions())
+
+    def remove_status(self, index: int) -> Effect:
+        status = self.statuses.pop(index)
+        if self._bonuses is not None and all(s is not status for s in self.statuses):
+            self._bonuses.untrack(status)
+        self._invalidate_cache(Dependency.EFFECTS, *status.contributions())
+        return status
+
+    def remove_statuses(self, statuses: list[Effect]):
+        """Removes several statuses at once, ignoring any already removed."""
+        removed = {id(status) for status in statuses}
+        self.statuses[:] = [s for s in self.statuses if id(s) not in removed]
+        if self._bonuses is not None:
+            for status in statuses:
+                self._bonuses.untrack(status)
+        contributions = {c for status in statuses for c in status.contributions()}
+        self._invalidate_cache(Dependency.EFFECTS, *contributions)
+
+    def toggle_condition(self, effect: Effect):
+        effect.condition.toggle()
+        if self._bonuses is not None:
+            bonuses = self._bonuses
+            # Only the effects using this condition change, in O(log n) each.
+            for key in bonuses.conditions.get(id(effect.condition), ()):
+                self._remove_conditional_bonuses(bonuses.effects[key])
+                self._add_conditional_bonuses(bonuses.effects[key])
+        self._invalidate_cache(Dependency.CONDITIONS)
+
+    def fork(self) -> "Character":
+        """
+        Returns a copy which can be toggled and given statuses independently.
+        The definition (statistics, weapons, feats, items) is shared, only the
+        status list and toggleable effects are copied. Cached values are
+        carried over as they remain valid until the copy is modified.
+        """
+
+        def copy_toggleable(effects: list[Effect]) -> list[Effect]:
+            copied = []
+            for effect in effects:
+                if hasattr(effect.condition, "toggle"):
+                    effect = copy.copy(effect)
+                    effect.condition = copy.copy(effect.condition)
+                copied.append(effect)
+            return copied
+
+        fork = dataclasses.replace(
+            self,
+            feats=copy_toggleable(self.feats),
+            items=copy_toggleable(self.items),
+            abilities=copy_toggleable(self.abilities),
+            statuses=copy_toggleable(self.statuses),
+        )
+        # The effect index and evaluator refer to this character's effects, not
+        # the copies.
+        fork._cache = {
+            key: entry
+            for key, entry in self._cache.items()
+            if key[0] not in ("effect_index", "evaluator")
+        }
+        return fork
 
     def all_effects(self) -> list[Effect]:
         return self.abilities + self.feats + self.statuses + self.items
 
+    @cached(Dependency.EFFECTS)
+    def effect_index(self) -> dict[Contribution, tuple[Effect, ...]]:
+        """Effects grouped by what they contribute to, in all_effects() order."""
+        index = {contribution: [] for contribution in Contribution}
+        for effect in self.all_effects():
+            for contribution in effect.contributions():
+                index[contribution].append(effect)
+        return {contribution: tuple(effects) for contribution, effects in index.items()}
+
+    def effects_for(self, contribution: Contribution) -> tuple[Effect, ...]:
+        return self.effect_index()[contribution]
+
+    @cached(Dependency.EFFECTS)
+    def evaluator(self) -> CompiledCharacter:
+        """
+        The character's attack and damage compiled for evaluating many toggle
+        states quickly, recompiled only when its effects change.
+        """
+        return CompiledCharacter(self)
+
     def can_be_two_handed(self) -> bool:
         return (
             self.main_hand is not None
@@ -58,8 +336,104 @@ class Character:
         if not self.can_be_two_handed():
             return False
         self._two_handed = not self._two_handed
+        # Damage bonuses are only refreshed when next needed, see damage_bonus().
+        self._invalidate_cache(Dependency.TWO_HANDED)
         return True
 
+    def _effect_bonuses(self) -> _EffectBonuses:
+        if self._bonuses is None:
+            self._bonuses = _EffectBonuses(self._two_handed)
+            if self.main_hand is not None:
+                self._add_bonuses(self.main_hand, rank=-1)
+            for rank, effects in enumerate(
+                (self.abilities, self.feats, self.statuses, self.items)
+            ):
+                for effect in effects:
+                    self._add_bonuses(effect, rank)
+        return self._bonuses
+
+    def _add_bonuses(self, effect: Effect, rank: int):
+        if not self._bonuses.track(effect, rank):
+            return
+        contributions = effect.contributions()
+        if Contribution.STATISTICS in contributions:
+            key = id(effect)
+            order = self._bonuses.orders[key]
+            bonus_type = effect.bonus_type()
+            for stat in Statistic:
+                if value := effect.statistic_bonus(self, stat):
+                    self._bonuses.resolver.add(key, stat, bonus_type, value, order)
+        self._add_conditional_bonuses(effect, contributions)
+
+    def _add_conditional_bonuses(
+        self, effect: Effect, contributions: frozenset[Contribution] | None = None
+    ):
+        """Adds the bonuses which only apply while the effect's condition holds."""
+        if contributions is None:
+            contributions = effect.contributions()
+        is_main_hand = effect is self.main_hand
+        if not (
+            is_main_hand
+            or Contribution.ATTACK in contributions
+            or Contribution.DAMAGE in contributions
+            or Contribution.SAVES in contributions
+        ) or not effect.condition(self):
+            return
+        key = id(effect)
+        order = self._bonuses.orders[key]
+        bonus_type = effect.bonus_type()
+        resolver = self._bonuses.resolver
+        if Contribution.ATTACK in contributions or is_main_hand:
+            value = effect.attack_bonus(self)
+            resolver.add(key, Contribution.ATTACK, bonus_type, value, order)
+        if is_main_hand:
+            # The weapon's enhancement to damage stacks like that to attack.
+            value = effect.enchantment_modifier
+            resolver.add(key, Contribution.DAMAGE, bonus_type, value, order)
+        elif Contribution.DAMAGE in contributions:
+            self._add_damage_bonus(effect, bonus_type)
+        if Contribution.SAVES in contributions:
+            for save, value in effect.saves_bonuses(self).items():
+                resolver.add(key, save, bonus_type, value, order)
+
+    def _add_damage_bonus(self, effect: Effect, bonus_type: BonusType | None = None):
+        if self._bonuses.two_handed != self._two_handed:
+            # Added in another two-handed state than the rest, so they're mixed.
+            self._bonuses.two_handed = None
+        # Only flat damage is a typed bonus, extra dice (eg, 1d6 fire) always add.
+        flat = 0
+        dice = []
+        for d in effect.damage_bonus(self):
+            if d.is_variable():
+                dice.append(d)
+            else:
+                flat += d.num + d.modifier
+        key = id(effect)
+        self._bonuses.resolver.add(
+            key,
+            Contribution.DAMAGE,
+            effect.bonus_type() if bonus_type is None else bonus_type,
+            flat,
+            self._bonuses.orders[key],
+        )
+        if dice:
+            self._bonuses.dice[key] = tuple(dice)
+        else:
+            self._bonuses.dice.pop(key, None)
+
+    def _remove_conditional_bonuses(self, effect: Effect):
+        key = id(effect)
+        resolver = self._bonuses.resolver
+        resolver.discard(key, Contribution.ATTACK)
+        resolver.discard(key, Contribution.DAMAGE)
+        for save in Save:
+            resolver.discard(key, save)
+        self._bonuses.dice.pop(key, None)
+
+    def applied_statistic_bonus(self, effect: Effect, statistic: Statistic) -> int:
+        """The effect's bonus to the statistic, or 0 if it doesn't stack."""
+        return self._effect_bonuses().resolver.applied(id(effect), statistic)
+
     def has_feat(self, feat_type: type[Feat]) -> bool:
         return any(isinstance(feat, feat_type) for feat in self.feats)
 
@@ -73,32 +447,58 @@ class Character:
             else Statistic.STRENGTH
         )
 
+    @cached(Contribution.STATISTICS)
     def modified_statistic(self, stat: Statistic) -> int:
         original = self.statistics.get(stat, 10)
-        modified = original + sum(
-            effect.statistic_bonus(self, stat) for effect in self.all_effects()
-        )
-        return modified
+        return original + self._effect_bonuses().resolver.total(stat)
 
+    @cached(Contribution.ATTACK, Contribution.STATISTICS, Dependency.CONDITIONS)
     def attack_bonus(self) -> dict[str, int]:
+        bonuses = self._effect_bonuses()
         modifiers = {
             BAB_KEY: self.base_attack_bonus,
         }
-        if self.main_hand and (enchantment := self.main_hand.attack_bonus(self)):
-            modifiers["Weapon Enchantment"] = enchantment
+        if self.main_hand and (
+            enchantment := bonuses.resolver.applied(
+                id(self.main_hand), Contribution.ATTACK
+            )
+        ):
+            modifiers[WEAPON_ENCHANTMENT_KEY] = enchantment
 
         stat = self.attack_statistic()
         modifiers[stat.value] = stat_modifier(self.statistics[stat])
-        modifiers |= {
-            effect.name: effect.attack_bonus(self)
-            for effect in self.all_effects()
-            if effect.condition(self)
-        }
+        for effect in bonuses.sources(Contribution.ATTACK, stat):
+            if effect is self.main_hand or not effect.condition(self):
+                continue
+            # The effect's own bonus, and the change from its statistic bonus.
+            value = bonuses.resolver.applied(
+                id(effect), Contribution.ATTACK
+            ) + effect.statistic_modifier_bonus(self, stat)
+            modifiers[effect.name] = modifiers.get(effect.name, 0) + value
         return {name: value for name, value in modifiers.items() if value}
 
+    @cached(
+        Contribution.DAMAGE,
+        Contribution.STATISTICS,
+        Contribution.SIZE,
+        Dependency.CONDITIONS,
+        Dependency.TWO_HANDED,
+    )
     def damage_bonus(self) -> dict[str, list[Dice]]:
+        bonuses = self._effect_bonuses()
+        weapon_damage = self.main_hand.damage_bonus(self)
+        # The weapon's enhancement, if another bonus of its type doesn't beat it.
+        enchantment = bonuses.resolver.applied(id(self.main_hand), Contribution.DAMAGE)
+        if enchantment != self.main_hand.enchantment_modifier:
+            base_damage = weapon_damage[0]
+            weapon_damage[0] = Dice.of(
+                base_damage.num,
+                sides=base_damage.sides,
+                modifier=enchantment,
+                type=base_damage.type,
+            )
         modifiers = {
-            self.main_hand.name: self.main_hand.damage_bonus(self),
+            self.main_hand.name: weapon_damage,
         }
         if self.off_hand:
             modifiers[self.off_hand.name] = self.off_hand.damage_bonus(self)
@@ -107,37 +507,58 @@ class Character:
         strength_mod = stat_modifier(self.statistics[stat])
         if self._two_handed:
             strength_mod = int(strength_mod * 1.5)
-        modifiers[stat.value] = [Dice(num=strength_mod)]
+        modifiers[stat.value] = [Dice.of(strength_mod)]
 
-        modifiers |= {
-            effect.name: effect.damage_bonus(self)
-            for effect in self.all_effects()
-            if effect.condition(self)
-        }
+        if bonuses.two_handed != self._two_handed:
+            for effect in self.effects_for(Contribution.DAMAGE):
+                if (
+                    effect is not self.main_hand
+                    and id(effect) in bonuses.effects
+                    and effect.condition(self)
+                ):
+                    self._add_damage_bonus(effect)
+            bonuses.two_handed = self._two_handed
+        mult = 1.5 if self.is_two_handed() else 1.0
+        for effect in bonuses.sources(Contribution.DAMAGE, stat, dice=True):
+            if effect is self.main_hand or not effect.condition(self):
+                continue
+            key = id(effect)
+            flat = bonuses.resolver.applied(
+                key, Contribution.DAMAGE
+            ) + effect.statistic_modifier_bonus(self, stat, mult=mult)
+            dice = [Dice.of(flat)] if flat else []
+            dice.extend(bonuses.dice.get(key, ()))
+            modifiers[effect.name] = modifiers.get(effect.name, []) + dice
         return {name: value for name, value in modifiers.items() if value}
 
+    @cached(Contribution.CRITICAL, Dependency.CONDITIONS)
     def critical_bonus(self) -> CriticalBonus:
         bonus = self.main_hand.critical_bonus(self, None)
-        for effect in self.all_effects():
+        for effect in self.effects_for(Contribution.CRITICAL):
             if effect.condition(self):
                 bonus = effect.critical_bonus(self, bonus)
 
         return bonus
 
+    @cached(Contribution.SIZE)
     def get_size(self) -> Size:
-        size_change = sum(effect.size_change(self) for effect in self.all_effects())
+        size_change = sum(
+            effect.size_change(self)
+            for effect in self.effects_for(Contribution.SIZE)
+        )
         sizes = tuple(Size)
         pos = sizes.index(self.base_size)
         pos += size_change
         pos = max(0, min(pos, len(sizes) - 1))
         return sizes[pos]
 
+    @cached(Contribution.ARMOUR_CLASS, Contribution.SIZE, Contribution.STATISTICS)
     def armour_bonuses(self) -> dict[ArmorBonus, int]:
         bonuses = {ac_type: 0 for ac_type in ArmorBonus}
         bonuses[ArmorBonus.SIZE] = -self.get_size().value
 
         max_dex_bonus = 99
-        for effect in self.all_effects():
+        for effect in self.effects_for(Contribution.ARMOUR_CLASS):
             max_dex_bonus = min(max_dex_bonus, getattr(effect, "max_dex_bonus", 99))
             ac_bonuses = effect.armour_class_bonus(self)
 
@@ -154,16 +575,18 @@ class Character:
 
         return {ac_type: value for ac_type, value in bonuses.items() if value}
 
+    @cached(Contribution.ARMOUR_CLASS, Contribution.STATISTICS)
     def is_dex_capped(self) -> bool:
         # For some reason the dex cap only applies to AC otherwise would just modify
         # modified_statistic() for DEX.
         max_dex_bonus = 99
-        for effect in self.all_effects():
+        for effect in self.effects_for(Contribution.ARMOUR_CLASS):
             max_dex_bonus = min(max_dex_bonus, getattr(effect, "max_dex_bonus", 99))
         return (
             stat_modifier(self.modified_statistic(Statistic.DEXTERITY)) > max_dex_bonus
         )
 
+    @cached(Contribution.SIZE, Contribution.STATISTICS)
     def get_cmb(self) -> dict[str, int]:
         size = self.get_size()
         statistic = (
@@ -179,6 +602,7 @@ class Character:
         }
         return {name: value for name, value in modifiers.items() if value}
 
+    @cached(Contribution.ARMOUR_CLASS, Contribution.SIZE, Contribution.STATISTICS)
     def get_cmd(self) -> dict[str, int]:
         ac_bonuses = self.armour_bonuses()
         applicable_ac_types = {
@@ -210,6 +634,7 @@ class Character:
         }
         return {name: value for name, value in modifiers.items() if value}
 
+    @cached(Contribution.SAVES, Contribution.STATISTICS, Dependency.CONDITIONS)
     def get_saves(self) -> dict[Save, dict[str, int]]:
         mapping = {
             Save.FORTITUDE: Statistic.CONSTITUTION,
@@ -226,19 +651,53 @@ class Character:
             for save, value in self.base_saves.items()
         }
 
-        for effect in self.all_effects():
-            if effect.condition(self):
-                for save, value in effect.saves_bonuses(self).items():
+        bonuses = self._effect_bonuses()
+        for save in Save:
+            for effect in bonuses.sources(save):
+                if value := bonuses.resolver.applied(id(effect), save):
                     saves[save][effect.name] = value
 
         return saves
 
+    @cached(Contribution.STATISTICS)
     def get_hp_offset(self) -> int:
         con = self.modified_statistic(Statistic.CONSTITUTION)
         status_con_offset = sum(
-            effect.statistic_bonus(self, Statistic.CONSTITUTION)
+            self.applied_statistic_bonus(effect, Statistic.CONSTITUTION)
             for effect in self.statuses
+            if Contribution.STATISTICS in effect.contributions()
         )
         statusless_con = con - status_con_offset
         offset = stat_modifier(con) - stat_modifier(statusless_con)
         return self.level * offset
+
+    @cached(Dependency.EFFECTS, Dependency.CONDITIONS, Dependency.TWO_HANDED)
+    def snapshot(self) -> Snapshot:
+        # Queries share cached intermediate values (size, modified statistics,
+        # armour bonuses), so each is only computed once per snapshot. The same
+        # snapshot is returned until something changes, so callers can compare
+        # snapshots by identity to find out if a character has changed.
+        return Snapshot(
+            size=self.get_size(),
+            weapon=self.main_hand.name if self.main_hand else None,
+            two_handed=self.is_two_handed(),
+            statistics=types.MappingProxyType(
+                {stat: self.modified_statistic(stat) for stat in Statistic}
+            ),
+            attack=types.MappingProxyType(dict(self.attack_bonus())),
+            damage=types.MappingProxyType(
+                {name: tuple(dice) for name, dice in self.damage_bonus().items()}
+            ),
+            critical=self.critical_bonus(),
+            armour=types.MappingProxyType(dict(self.armour_bonuses())),
+            dex_capped=self.is_dex_capped(),
+            cmb=types.MappingProxyType(dict(self.get_cmb())),
+            cmd=types.MappingProxyType(dict(self.get_cmd())),
+            saves=types.MappingProxyType(
+                {
+                    save: types.MappingProxyType(dict(breakdown))
+                    for save, breakdown in self.get_saves().items()
+                }
+            ),
+            hp_offset=self.get_hp_offset(),
+        )
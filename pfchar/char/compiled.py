@@ -0,0 +1,276 @@
+"""
+A character's attack and damage compiled for evaluating many toggle states of
+the same effects, eg, by the optimiser.
+
+Compiling walks the effects once. Bonuses of effects whose condition can't be
+toggled are folded into constants, after stacking, and only the bonuses of
+toggleable effects are left as terms checked against the toggle state. Damage
+depends on two-handed wielding, so it's compiled for each two-handed state the
+first time it's evaluated in it. Critical bonuses are chained through each
+effect, so the chain is folded up to the first toggleable effect and the rest
+are kept as steps.
+
+Conditions which can't be toggled are assumed to only depend on the character's
+definition (eg, the weapon type), as the built in ones do.
+"""
+
+import dataclasses
+from typing import TYPE_CHECKING, Callable, Iterable, Sequence
+
+from pfchar.char.base import (
+    BonusType,
+    Contribution,
+    CriticalBonus,
+    Dice,
+    Effect,
+    Statistic,
+    stat_modifier,
+)
+from pfchar.char.bonuses import stacks
+from pfchar import probability, utils
+
+if TYPE_CHECKING:
+    from pfchar.char.character import Character
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class _Terms:
+    """The total of the bonuses to one target after stacking."""
+
+    constant: int
+    # (toggle, value) of stacking bonuses of toggleable effects.
+    stacking: tuple[tuple[int, int], ...]
+    # For each type with toggleable bonuses above the best constant one: that
+    # constant bonus, and the (toggle, value) of the higher ones, highest first.
+    typed: tuple[tuple[int, tuple[tuple[int, int], ...]], ...]
+
+    def total(self, enabled: Sequence[bool]) -> int:
+        total = self.constant
+        for toggle, value in self.stacking:
+            if enabled[toggle]:
+                total += value
+        for constant, candidates in self.typed:
+            for toggle, value in candidates:
+                if enabled[toggle]:
+                    total += value - constant
+                    break
+        return total
+
+
+def _fold(entries: Iterable[tuple[int | None, BonusType, int]]) -> _Terms:
+    """Folds (toggle or None if constant, type, value) bonuses into _Terms."""
+    constant = 0
+    stacking = []
+    best: dict[BonusType, int] = {}
+    toggleable: dict[BonusType, list[tuple[int, int]]] = {}
+    for toggle, bonus_type, value in entries:
+        if not value:
+            continue
+        if stacks(bonus_type, value):
+            if toggle is None:
+                constant += value
+            else:
+                stacking.append((toggle, value))
+        elif toggle is None:
+            best[bonus_type] = max(best.get(bonus_type, 0), value)
+        else:
+            toggleable.setdefault(bonus_type, []).append((toggle, value))
+    typed = []
+    for bonus_type, candidates in toggleable.items():
+        floor = best.get(bonus_type, 0)
+        higher = sorted(
+            (candidate for candidate in candidates if candidate[1] > floor),
+            key=lambda candidate: -candidate[1],
+        )
+        if higher:
+            typed.append((floor, tuple(higher)))
+    return _Terms(constant + sum(best.values()), tuple(stacking), tuple(typed))
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class _Damage:
+    """Damage in one two-handed state."""
+
+    # The weapon's own dice, multiplied on a critical hit with all flat damage.
+    weapon_dice: tuple[Dice, ...]
+    flat: _Terms
+    # Extra dice, which aren't multiplied.
+    extra_dice: tuple[Dice, ...]
+    toggled_dice: tuple[tuple[int, tuple[Dice, ...]], ...]
+
+
+class CompiledCharacter:
+    """
+    Evaluates the attack and damage profile of a character in its current
+    toggle and two-handed state, as Character.snapshot() would but without
+    recomputing each effect. Valid until the character's effects change, see
+    Character.evaluator().
+    """
+
+    __slots__ = (
+        "_positions",
+        "_toggles",
+        "_effects",
+        "_base_attack_bonus",
+        "_attack",
+        "_critical",
+        "_critical_steps",
+        "_damage",
+    )
+
+    def __init__(self, character: "Character"):
+        all_effects = character.all_effects()
+        # Toggleable effects are read by position, as forks copy them.
+        self._positions = tuple(
+            i
+            for i, effect in enumerate(all_effects)
+            if hasattr(effect.condition, "toggle")
+        )
+        self._toggles: dict[int, int] = {}
+        for toggle, position in enumerate(self._positions):
+            self._toggles.setdefault(id(all_effects[position]), toggle)
+        # Effects with bonuses which may apply, in the order the Character adds
+        # them, paired with their toggle or None if they always apply.
+        self._effects: list[tuple[Effect, int | None]] = []
+        seen = set()
+        main_hand = [character.main_hand] if character.main_hand else []
+        for effect in main_hand + all_effects:
+            if id(effect) in seen:
+                continue
+            seen.add(id(effect))
+            toggle = self._toggle(character, effect)
+            if toggle is not False:
+                self._effects.append((effect, toggle))
+
+        self._base_attack_bonus = character.base_attack_bonus
+        self._attack = self._compile_attack(character)
+        self._critical, self._critical_steps = self._compile_critical(character)
+        self._damage: dict[bool, _Damage] = {}
+
+    def _toggle(self, character: "Character", effect: Effect) -> int | None | bool:
+        """The effect's toggle, None if it always applies or False if never."""
+        toggle = self._toggles.get(id(effect))
+        if toggle is None and not effect.condition(character):
+            return False
+        return toggle
+
+    def _compile_attack(self, character: "Character") -> _Terms:
+        stat = character.attack_statistic()
+        entries = [(None, BonusType.UNTYPED, stat_modifier(character.statistics[stat]))]
+        for effect, toggle in self._effects:
+            contributions = effect.contributions()
+            is_main_hand = effect is character.main_hand
+            if Contribution.ATTACK in contributions or is_main_hand:
+                value = effect.attack_bonus(character)
+                entries.append((toggle, effect.bonus_type(), value))
+            if Contribution.STATISTICS in contributions and not is_main_hand:
+                value = effect.statistic_modifier_bonus(character, stat)
+                entries.append((toggle, BonusType.UNTYPED, value))
+        return _fold(entries)
+
+    def _compile_critical(
+        self, character: "Character"
+    ) -> tuple[CriticalBonus, tuple[tuple[int | None, Callable], ...]]:
+        bonus = character.main_hand.critical_bonus(character, None)
+        steps = []
+        for effect in character.effects_for(Contribution.CRITICAL):
+            toggle = self._toggle(character, effect)
+            if toggle is False:
+                continue
+            if toggle is None and not steps:
+                bonus = effect.critical_bonus(character, bonus)
+            else:
+                steps.append((toggle, effect.critical_bonus))
+        return bonus, tuple(steps)
+
+    def _compile_damage(self, character: "Character") -> _Damage:
+        main_hand, off_hand = character.main_hand, character.off_hand
+        weapons = {main_hand.name: main_hand.damage_bonus(character)}
+        if off_hand:
+            weapons[off_hand.name] = off_hand.damage_bonus(character)
+        weapon_dice = ()
+        flat = 0
+        extra_dice = []
+        for name, dice_list in weapons.items():
+            for i, dice in enumerate(dice_list):
+                if name == main_hand.name and i == 0:
+                    # Its enhancement is added below, as it may not stack.
+                    weapon_dice = (Dice.of(dice.num, sides=dice.sides, type=dice.type),)
+                elif dice.is_variable():
+                    extra_dice.append(dice)
+                else:
+                    flat += dice.num + dice.modifier
+
+        stat = Statistic.STRENGTH
+        strength_mod = stat_modifier(character.statistics[stat])
+        if character._two_handed:
+            strength_mod = int(strength_mod * 1.5)
+        entries = [(None, BonusType.UNTYPED, flat + strength_mod)]
+        mult = 1.5 if character.is_two_handed() else 1.0
+        toggled_dice = []
+        for effect, toggle in self._effects:
+            contributions = effect.contributions()
+            if effect is main_hand:
+                value = effect.enchantment_modifier
+                entries.append((toggle, effect.bonus_type(), value))
+            elif Contribution.DAMAGE in contributions:
+                value = 0
+                variable = []
+                for dice in effect.damage_bonus(character):
+                    if dice.is_variable():
+                        variable.append(dice)
+                    else:
+                        value += dice.num + dice.modifier
+                entries.append((toggle, effect.bonus_type(), value))
+                if toggle is None:
+                    extra_dice.extend(variable)
+                elif variable:
+                    toggled_dice.append((toggle, tuple(variable)))
+            if Contribution.STATISTICS in contributions:
+                value = effect.statistic_modifier_bonus(character, stat, mult=mult)
+                entries.append((toggle, BonusType.UNTYPED, value))
+        return _Damage(
+            weapon_dice, _fold(entries), tuple(extra_dice), tuple(toggled_dice)
+        )
+
+    def enabled(self, character: "Character") -> list[bool]:
+        """The state of each toggle of the character."""
+        effects = character.all_effects()
+        return [effects[i].condition(character) for i in self._positions]
+
+    def attacks(self, enabled: Sequence[bool]) -> tuple[int, ...]:
+        total = self._base_attack_bonus + self._attack.total(enabled)
+        return tuple(utils.attack_sequence(total, self._base_attack_bonus))
+
+    def critical_bonus(
+        self, character: "Character", enabled: Sequence[bool]
+    ) -> CriticalBonus:
+        bonus = self._critical
+        for toggle, step in self._critical_steps:
+            if toggle is None or enabled[toggle]:
+                bonus = step(character, bonus)
+        return bonus
+
+    def profile(
+        self, character: "Character", enabled: Sequence[bool]
+    ) -> probability.AttackProfile:
+        if character._two_handed not in self._damage:
+            self._damage[character._two_handed] = self._compile_damage(character)
+        damage = self._damage[character._two_handed]
+        extra_dice = damage.extra_dice
+        for toggle, dice in damage.toggled_dice:
+            if enabled[toggle]:
+                extra_dice += dice
+        return probability.dice_profile(
+            damage.weapon_dice + (Dice.of(damage.flat.total(enabled)),),
+            extra_dice,
+            self.critical_bonus(character, enabled),
+        )
+
+    def profile_key(self, character: "Character") -> tuple:
+        """
+        The attacks of a full attack and their damage profile, everything
+        expected damage depends on, for the character's current state.
+        """
+        enabled = self.enabled(character)
+        return self.attacks(enabled), self.profile(character, enabled)
@@ -7,6 +7,8 @@ if TYPE_CHECKING:
 
 
 class EnabledCondition(Condition):
+    __slots__ = ("enabled",)
+
     def __init__(self, enabled: bool = False):
         self.enabled = enabled
 
@@ -18,6 +20,8 @@ class EnabledCondition(Condition):
 
 
 class WeaponTypeCondition(Condition):
+    __slots__ = ("weapon_type",)
+
     def __init__(self, weapon_type: WeaponType):
         self.weapon_type = weapon_type
 
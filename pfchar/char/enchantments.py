@@ -7,6 +7,8 @@ if TYPE_CHECKING:
 
 
 class WeaponEnchantment(Effect):
+    __slots__ = ("_damage_dice",)
+
     def __init__(self, name: str, damage_dice: list[Dice] | None = None):
         super().__init__(name=name)
         self._damage_dice = damage_dice or []
@@ -16,10 +18,12 @@ class WeaponEnchantment(Effect):
 
 
 class FlamingBurst(WeaponEnchantment):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(
             name="Flaming Burst",
-            damage_dice=[Dice(num=1, sides=6)],
+            damage_dice=[Dice.of(1, sides=6)],
         )
 
     def critical_bonus(self, character: "Character", critical_bonus) -> CriticalBonus:
@@ -28,16 +32,20 @@ class FlamingBurst(WeaponEnchantment):
             crit_multiplier=critical_bonus.crit_multiplier,
             damage_bonus=(
                 critical_bonus.damage_bonus
-                + [Dice(num=critical_bonus.crit_multiplier - 1, sides=10)]
+                + (Dice.of(critical_bonus.crit_multiplier - 1, sides=10),)
             ),
         )
 
 
 class Merciful(WeaponEnchantment):
+    __slots__ = ()
+
     def __init__(self):
-        super().__init__(name="Merciful", damage_dice=[Dice(num=1, sides=6)])
+        super().__init__(name="Merciful", damage_dice=[Dice.of(1, sides=6)])
 
 
 class Sneaky(WeaponEnchantment):
+    __slots__ = ()
+
     def __init__(self):
-        super().__init__(name="Sneaky", damage_dice=[Dice(num=7, sides=6)])
+        super().__init__(name="Sneaky", damage_dice=[Dice.of(7, sides=6)])
@@ -9,10 +9,12 @@ if TYPE_CHECKING:
 
 
 class Feat(Effect):
-    pass
+    __slots__ = ()
 
 
 class Dodge(Feat):
+    __slots__ = ()
+
     def __init__(self, name: str = "Dodge"):
         super().__init__(name=name)
 
@@ -22,6 +24,8 @@ class Dodge(Feat):
 
 @dataclasses.dataclass
 class WeaponFocus(Feat):
+    __slots__ = ()
+
     def __init__(self, weapon_type: WeaponType):
         super().__init__(name="Weapon Focus")
         self.condition = WeaponTypeCondition(weapon_type)
@@ -32,6 +36,8 @@ class WeaponFocus(Feat):
 
 @dataclasses.dataclass
 class WeaponTraining(Feat):
+    __slots__ = ()
+
     def __init__(self, weapon_type: WeaponType):
         super().__init__(name="Weapon Training")
         self.condition = WeaponTypeCondition(weapon_type)
@@ -40,10 +46,10 @@ class WeaponTraining(Feat):
         return 1 + (max(0, character.level - 3) // 4)
 
     def damage_bonus(self, character: "Character") -> list[Dice]:
-        return [Dice(self.attack_bonus(character))]
+        return [Dice.of(self.attack_bonus(character))]
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class PowerAttack(Feat):
     name: str = "Power Attack"
     condition: EnabledCondition = dataclasses.field(default_factory=EnabledCondition)
@@ -55,11 +61,13 @@ class PowerAttack(Feat):
         value = (character.base_attack_bonus // 4 + 1) * 2
         if character.is_two_handed():
             value = int(value * 1.5)
-        return [Dice(num=value)]
+        return [Dice.of(value)]
 
 
 @dataclasses.dataclass
 class ImprovedCritical(Feat):
+    __slots__ = ()
+
     def __init__(self, weapon_type: WeaponType):
         super().__init__(name="Improved Critical")
         self.condition = WeaponTypeCondition(weapon_type)
@@ -76,5 +84,7 @@ class ImprovedCritical(Feat):
 
 @dataclasses.dataclass
 class WeaponFinesse(Feat):
+    __slots__ = ()
+
     def __init__(self):
         super().__init__(name="Weapon Finesse")
@@ -3,6 +3,7 @@ from typing import TYPE_CHECKING
 
 from pfchar.char.base import (
     ArmorBonus,
+    BonusType,
     CriticalBonus,
     Dice,
     Effect,
@@ -17,21 +18,25 @@ if TYPE_CHECKING:
     from pfchar.char.character import Character
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Item(Effect):
     pass
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class StatisticModifyingItem(Item):
     name: str
     stats: dict[Statistic, int] = dataclasses.field(default_factory=dict)
 
+    def bonus_type(self) -> BonusType:
+        # Belts, headbands and the like give enhancement bonuses.
+        return BonusType.ENHANCEMENT
+
     def statistic_bonus(self, character, stat):
         return self.stats.get(stat, 0)
 
 
-@dataclasses.dataclass(kw_only=True)
+@dataclasses.dataclass(kw_only=True, slots=True)
 class Weapon(Item):
     type: WeaponType
     base_damage: Dice
@@ -41,30 +46,31 @@ class Weapon(Item):
     enchantment_modifier: int = 0
     enchantments: list[WeaponEnchantment] = dataclasses.field(default_factory=list)
 
+    def bonus_type(self) -> BonusType:
+        return BonusType.ENHANCEMENT
+
     def attack_bonus(self, character: "Character") -> int:
         return self.enchantment_modifier
 
     def damage_bonus(self, character: "Character") -> list[Dice]:
-        base_damage = Dice(
-            self.base_damage.num,
-            sides=self.base_damage.sides,
-        )
-        if character.base_size != character.get_size():
-            from_size = character.base_size
-            to_size = character.get_size()
-            base_damage = utils.get_damage_progression(base_damage, from_size, to_size)
-        return [
-            Dice(
+        base_damage = Dice.of(self.base_damage.num, sides=self.base_damage.sides)
+        size = character.get_size()
+        if character.base_size != size:
+            # Shared entries of the progression table, not copies.
+            base_damage = utils.get_damage_progression(
+                base_damage, character.base_size, size
+            )
+        damage = [
+            Dice.of(
                 base_damage.num,
                 sides=base_damage.sides,
                 modifier=self.enchantment_modifier,
             )
-        ] + [
-            dice
-            for enchantment in self.enchantments
-            if enchantment.condition(character)
-            for dice in enchantment.damage_bonus(character)
         ]
+        for enchantment in self.enchantments:
+            if enchantment.condition(character):
+                damage.extend(enchantment.damage_bonus(character))
+        return damage
 
     def critical_bonus(
         self, character: "Character", critical_bonus: "CriticalBonus"
@@ -76,7 +82,7 @@ class Weapon(Item):
         return bonus
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class Armour(Item):
     name: str
     armour_bonus: int = 0
@@ -100,7 +106,7 @@ class Armour(Item):
         return bonuses
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class ShieldOfTheSun(Armour):
     name: str = "Shield of the Sun"
     shield_bonus: int = 2
@@ -109,7 +115,7 @@ class ShieldOfTheSun(Armour):
     spell_failure_chance: int = 15
 
 
-@dataclasses.dataclass
+@dataclasses.dataclass(slots=True)
 class CelestialArmour(Armour):
     name: str = "Celestial Armour"
     armour_bonus: int = 6
@@ -121,6 +127,8 @@ class CelestialArmour(Armour):
 
 @dataclasses.dataclass
 class AmuletOfNaturalArmor(Item):
+    __slots__ = ("bonus",)
+
     def __init__(self, bonus: int = 1):
         super().__init__(name=f"Amulet of Natural Armor (+{bonus})")
         self.bonus = bonus
@@ -131,6 +139,8 @@ class AmuletOfNaturalArmor(Item):
 
 @dataclasses.dataclass
 class RingOfProtection(Item):
+    __slots__ = ("bonus",)
+
     def __init__(self, bonus: int = 1):
         super().__init__(name=f"Ring of Protection (+{bonus})")
         self.bonus = bonus
@@ -141,9 +151,14 @@ class RingOfProtection(Item):
 
 @dataclasses.dataclass
 class CloakOfResistance(Item):
+    __slots__ = ("bonus",)
+
     def __init__(self, bonus: int = 1):
         super().__init__(name=f"Cloak of Resistance (+{bonus})")
         self.bonus = bonus
 
+    def bonus_type(self) -> BonusType:
+        return BonusType.RESISTANCE
+
     def saves_bonuses(self, character: "Character") -> dict[Save, int]:
         return {save: self.bonus for save in Save}
@@ -0,0 +1,179 @@
+"""
+Dice expressions, such as "2d6+3 fire", "1d8+2 slashing + 1d6 fire" or
+"1d4 vs undead", parsed into Dice and compiled for rolling.
+
+An expression is a sum of terms, each either dice ("2d6", "d8") or a flat
+number, and a term may be followed by a damage type or qualifier. The type
+applies to that term and every untyped term before it, back to the previous
+type, so "2d6+3 fire" is all fire damage. Dice can't be subtracted, but flat
+numbers can.
+
+    expression = parse("2d6+3 fire")
+    expression.dice  # (Dice(2, 6, 0, "fire"), Dice(3, 1, 0, "fire"))
+    expression.roll(random.Random())
+    expression.distribution()
+
+Parsing and compiling are memoized, so stored expressions which repeat across
+characters are only parsed once.
+"""
+
+import dataclasses
+import functools
+import itertools
+import operator
+import random
+import re
+from typing import TYPE_CHECKING, Iterable
+
+from pfchar.char.base import Dice
+
+if TYPE_CHECKING:
+    from pfchar.probability import Distribution
+
+MAX_DICE = 1000
+MAX_SIDES = 1000
+
+_TERM = re.compile(
+    r"""
+    \s*(?P<sign>[+-])?\s*
+    (?:(?P<num>\d*)\s*d\s*(?P<sides>\d+)|(?P<flat>\d+))
+    (?:\s+(?P<type>(?!d\b)[a-z][a-z' ]*?))?\s*
+    (?=[+-]|$)
+    """,
+    re.VERBOSE | re.IGNORECASE,
+)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class DiceExpression:
+    dice: tuple[Dice, ...]
+    # (sides, count) for each size of die, and the sum of everything flat.
+    pools: tuple[tuple[int, int], ...]
+    flat: int
+
+    @property
+    def minimum(self) -> int:
+        return self.flat + sum(count for _, count in self.pools)
+
+    @property
+    def maximum(self) -> int:
+        return self.flat + sum(sides * count for sides, count in self.pools)
+
+    def is_variable(self) -> bool:
+        return bool(self.pools)
+
+    def mean(self) -> float:
+        return self.flat + sum((sides + 1) / 2 * count for sides, count in self.pools)
+
+    def roll(self, rng: random.Random) -> int:
+        total = self.flat
+        for sides, count in self.pools:
+            total += sum(rng.choices(range(1, sides + 1), k=count))
+        return total
+
+    def roll_many(self, rolls: int, rng: random.Random) -> list[int]:
+        """Returns ``rolls`` totals, drawing each size of die in one batch."""
+        totals = [self.flat] * rolls
+        for sides, count in self.pools:
+            faces = rng.choices(range(1, sides + 1), k=rolls * count)
+            if count > 1:
+                faces = map(sum, zip(*[iter(faces)] * count))
+            totals = list(map(operator.add, totals, faces))
+        return totals
+
+    def distribution(self) -> "Distribution":
+        # Imported here as probability depends on utils, which depends on this.
+        from pfchar import probability
+
+        return probability.sum_distribution(self.dice)
+
+    def by_type(self) -> dict[str | None, "DiceExpression"]:
+        types = {}
+        for dice in self.dice:
+            types.setdefault(dice.type, []).append(dice)
+        return {type_: compile_dice(dice) for type_, dice in types.items()}
+
+    def __str__(self) -> str:
+        return format_dice(self.dice)
+
+
+@functools.lru_cache(maxsize=4096)
+def _compile(dice: tuple[Dice, ...]) -> DiceExpression:
+    pools = {}
+    flat = 0
+    for d in dice:
+        if d.is_variable():
+            pools[d.sides] = pools.get(d.sides, 0) + d.num
+            flat += d.modifier
+        else:
+            flat += d.num + d.modifier
+    return DiceExpression(dice, tuple(sorted(pools.items())), flat)
+
+
+def compile_dice(dice: Iterable[Dice]) -> DiceExpression:
+    return _compile(tuple(dice))
+
+
+@functools.lru_cache(maxsize=4096)
+def parse(expression: str) -> DiceExpression:
+    """Parses a dice expression, raising ValueError if it's invalid."""
+    if not expression.strip():
+        raise ValueError("Empty dice expression")
+    terms = []
+    # Untyped terms waiting for a type: (num, sides) with sides 1 for flat.
+    pending: list[tuple[int, int]] = []
+    position = 0
+    while position < len(expression):
+        match = _TERM.match(expression, position)
+        if match is None or match.end() == position:
+            raise ValueError(f"Invalid dice expression: {expression!r}")
+        if match["sign"] is None and position > 0:
+            raise ValueError(f"Missing + or - in dice expression: {expression!r}")
+        negative = match["sign"] == "-"
+        if match["flat"] is not None:
+            flat = int(match["flat"])
+            pending.append((-flat if negative else flat, 1))
+        else:
+            num = int(match["num"] or 1)
+            sides = int(match["sides"])
+            if negative:
+                raise ValueError(f"Can't subtract dice in {expression!r}")
+            if not 0 < num <= MAX_DICE or not 0 < sides <= MAX_SIDES:
+                raise ValueError(f"Unsupported dice {num}d{sides} in {expression!r}")
+            pending.append((num, sides))
+        if match["type"]:
+            type_ = " ".join(match["type"].lower().split())
+            terms.extend(Dice.of(n, sides=sides, type=type_) for n, sides in pending)
+            pending.clear()
+        position = match.end()
+    terms.extend(Dice.of(num, sides=sides) for num, sides in pending)
+    return _compile(tuple(terms))
+
+
+def _format_term(dice: Dice, first: bool) -> str:
+    if dice.is_variable():
+        text = f"{dice.num}d{dice.sides}"
+        if dice.modifier:
+            text += f"{dice.modifier:+d}"
+        return text if first else f"+{text}"
+    value = dice.num + dice.modifier
+    return str(value) if first else f"{value:+d}"
+
+
+def format_dice(dice: Iterable[Dice]) -> str:
+    """
+    Formats dice as an expression which parses back to the same total of each
+    type. Terms are grouped by type, with untyped terms last so they stay
+    untyped.
+    """
+    groups: dict[str | None, list[Dice]] = {}
+    for d in dice:
+        groups.setdefault(d.type, []).append(d)
+    untyped = groups.pop(None, [])
+    parts = []
+    for type_, group in itertools.chain(groups.items(), [(None, untyped)]):
+        if not group:
+            continue
+        text = "".join(_format_term(d, i == 0) for i, d in enumerate(group))
+        parts.append(f"{text} {type_}" if type_ else text)
+    return " + ".join(parts).replace("+ -", "- ")
@@ -0,0 +1,150 @@
+import bisect
+import dataclasses
+import itertools
+import random
+
+from pfchar.char.base import Effect
+from pfchar.char.character import Character, Snapshot
+from pfchar.scheduler import StatusScheduler
+from pfchar.simulate import Simulator
+
+
+@dataclasses.dataclass(eq=False)
+class Combatant:
+    character: Character
+    initiative: int
+    target: "Combatant | None" = None
+    damage_taken: int = 0
+    # Reused until the attacker's sheet or the target's AC changes.
+    _simulator: Simulator | None = dataclasses.field(default=None, repr=False)
+    _simulator_key: tuple[Snapshot, int] | None = dataclasses.field(
+        default=None, repr=False
+    )
+
+    @property
+    def name(self) -> str:
+        return self.character.name
+
+    def simulator(self, armour_class: int) -> Simulator:
+        sheet = self.character.snapshot()
+        key = self._simulator_key
+        if key is None or key[0] is not sheet or key[1] != armour_class:
+            self._simulator = Simulator(sheet, armour_class)
+            self._simulator_key = (sheet, armour_class)
+        return self._simulator
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class AttackResult:
+    attacker: Combatant
+    target: Combatant
+    damage: int
+    hits: int
+    criticals: int
+
+
+class Encounter:
+    """
+    Initiative order, round counter and timed statuses for a fight. Each
+    combatant's sheet stays cached on its Character, so resolving a round only
+    recomputes combatants whose effects changed since the last one.
+    """
+
+    def __init__(self, seed: int | None = None):
+        self.round = 1
+        self.turn = 0
+        self.started = False
+        self.rng = random.Random(seed)
+        self.scheduler = StatusScheduler()
+        self._order: list[tuple[int, int, Combatant]] = []
+        self._counter = itertools.count()
+
+    @property
+    def combatants(self) -> list[Combatant]:
+        return [combatant for _, _, combatant in self._order]
+
+    @property
+    def current(self) -> Combatant | None:
+        return self._order[self.turn][2] if self._order else None
+
+    def add(
+        self,
+        character: Character,
+        initiative: int,
+        target: Combatant | None = None,
+    ) -> Combatant:
+        combatant = Combatant(character, initiative, target=target)
+        # Ties keep the order combatants were added in.
+        entry = (-initiative, next(self._counter), combatant)
+        position = bisect.bisect(self._order, entry[:2], key=lambda e: e[:2])
+        # Before the first turn, the current combatant is whoever is on top.
+        if self.started and position <= self.turn:
+            self.turn += 1
+        self._order.insert(position, entry)
+        return combatant
+
+    def remove(self, combatant: Combatant):
+        position = self.combatants.index(combatant)
+        del self._order[position]
+        if position < self.turn:
+            self.turn -= 1
+        if self.turn >= len(self._order):
+            self.turn = 0
+        for other in self.combatants:
+            if other.target is combatant:
+                other.target = None
+
+    def add_status(self, combatant: Combatant, status: Effect, rounds: int):
+        combatant.character.add_status(status)
+        self.scheduler.schedule(combatant.character, status, rounds)
+
+    def next_turn(self) -> Combatant:
+        self.started = True
+        self.turn += 1
+        if self.turn >= len(self._order):
+            self.turn = 0
+            self.end_round()
+        return self.current
+
+    def end_round(self) -> list[Combatant]:
+        """Ticks down timed statuses, returning the combatants which changed."""
+        self.round += 1
+        changed = {id(c) for c in self.scheduler.advance(1)}
+        return [c for c in self.combatants if id(c.character) in changed]
+
+    def resolve_round(self) -> list[AttackResult]:
+        """Rolls a full attack for every combatant with a target, in order."""
+        results = []
+        # Target ACs are read up front so a round resolves against one state.
+        armour_classes = {
+            id(combatant): combatant.character.snapshot().total_ac
+            for combatant in self.combatants
+        }
+        # Combatants whose attacks roll alike, eg, forks of one monster against
+        # the same AC, share a single batch of rolls.
+        groups: dict[tuple, tuple[Simulator, list[Combatant]]] = {}
+        for combatant in self.combatants:
+            target = combatant.target
+            if target is None:
+                continue
+            simulator = combatant.simulator(armour_classes[id(target)])
+            groups.setdefault(simulator.profile, (simulator, []))[1].append(combatant)
+        rolled = {}
+        for simulator, attackers in groups.values():
+            rolls = zip(*simulator.roll_rounds(len(attackers), self.rng))
+            rolled.update(zip(map(id, attackers), rolls))
+        for combatant in self.combatants:
+            if id(combatant) not in rolled:
+                continue
+            damage, hits, criticals = rolled[id(combatant)]
+            combatant.target.damage_taken += damage
+            results.append(
+                AttackResult(
+                    attacker=combatant,
+                    target=combatant.target,
+                    damage=damage,
+                    hits=hits,
+                    criticals=criticals,
+                )
+            )
+        return results
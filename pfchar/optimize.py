@@ -0,0 +1,164 @@
+import dataclasses
+from typing import TYPE_CHECKING, Callable, Iterable, Mapping
+
+from pfchar.char.base import Contribution
+from pfchar.char.bonuses import STACKING_TYPES
+
+if TYPE_CHECKING:
+    from pfchar.char.base import Effect
+    from pfchar.char.character import Character
+
+
+TWO_HANDED = "Two Handed"
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Toggle:
+    name: str
+    is_enabled: Callable[[], bool]
+    toggle: Callable[[], object]
+    # Whether the toggle's effect adds to the sheet whatever else is enabled,
+    # so it can be checked for relevance on its own.
+    independent: bool = True
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Recommendation:
+    """Best toggle configuration for a contiguous range of target ACs."""
+
+    min_ac: int
+    max_ac: int
+    toggles: Mapping[str, bool]
+    expected_damage: Mapping[int, float]
+
+
+def get_toggles(character: "Character") -> list[Toggle]:
+    toggles = []
+    if character.can_be_two_handed():
+        toggles.append(
+            Toggle(TWO_HANDED, character.is_two_handed, character.toggle_two_handed)
+        )
+    for effect in character.all_effects():
+        if hasattr(effect.condition, "toggle"):
+            toggles.append(
+                Toggle(
+                    effect.name,
+                    lambda effect=effect: effect.condition.enabled,
+                    lambda effect=effect: character.toggle_condition(effect),
+                    independent=_is_independent(effect),
+                )
+            )
+    return toggles
+
+
+def _is_independent(effect: "Effect") -> bool:
+    # A typed bonus can be hidden by a bigger one of the same type, and a
+    # statistic bonus may only change a modifier together with another one.
+    return (
+        effect.bonus_type() in STACKING_TYPES
+        and Contribution.STATISTICS not in effect.contributions()
+    )
+
+
+def profile_key(character: "Character") -> tuple:
+    # Everything expected damage depends on; states sharing a key share results.
+    return character.evaluator().profile_key(character)
+
+
+def relevant_toggles(character: "Character", toggles: list[Toggle]) -> list[Toggle]:
+    """
+    Drops toggles which never change attack or damage. Toggleable conditions
+    only gate their own effect, so each independent one is checked in
+    isolation against every two-handed state. Others are always kept, as
+    whether they change anything depends on the other toggles.
+    """
+    two_handed = [t for t in toggles if t.name == TWO_HANDED]
+    relevant = list(two_handed)
+    for toggle in toggles:
+        if toggle.name == TWO_HANDED:
+            continue
+        if not toggle.independent:
+            relevant.append(toggle)
+            continue
+        changes = False
+        for _ in range(len(two_handed) + 1):
+            before = profile_key(character)
+            toggle.toggle()
+            after = profile_key(character)
+            toggle.toggle()
+            changes = changes or before != after
+            for t in two_handed:
+                t.toggle()
+        if changes:
+            relevant.append(toggle)
+    return relevant
+
+
+def gray_code_flips(count: int) -> Iterable[int]:
+    """Yields the toggle index to flip to visit every state after the first."""
+    for i in range(1, 2**count):
+        yield (i & -i).bit_length() - 1
+
+
+def optimise(
+    character: "Character", armour_classes: Iterable[int]
+) -> list[Recommendation]:
+    """
+    Finds the toggle configuration with the highest expected full attack
+    damage for each target AC. The character is left in its original state.
+    """
+    armour_classes = sorted(set(armour_classes))
+    toggles = relevant_toggles(character, get_toggles(character))
+    original = [t.is_enabled() for t in toggles]
+    results: dict[tuple, list[float]] = {}
+
+    def evaluate() -> list[float]:
+        key = profile_key(character)
+        if key not in results:
+            attacks, profile = key
+            results[key] = [
+                sum(profile.expected_damage(attack, ac) for attack in attacks)
+                for ac in armour_classes
+            ]
+        return results[key]
+
+    best = [(-1.0, tuple(original))] * len(armour_classes)
+    state = list(original)
+    try:
+        # Gray code order flips a single toggle per step, so each state only
+        # recomputes the queries depending on that toggle.
+        for flip in [None, *gray_code_flips(len(toggles))]:
+            if flip is not None:
+                toggles[flip].toggle()
+                state[flip] = not state[flip]
+            for i, damage in enumerate(evaluate()):
+                if damage > best[i][0]:
+                    best[i] = (damage, tuple(state))
+    finally:
+        for toggle, enabled in zip(toggles, original):
+            if toggle.is_enabled() != enabled:
+                toggle.toggle()
+
+    recommendations = []
+    for ac, (damage, state) in zip(armour_classes, best):
+        if (
+            recommendations
+            and recommendations[-1].max_ac == ac - 1
+            and tuple(recommendations[-1].toggles.values()) == state
+        ):
+            previous = recommendations[-1]
+            recommendations[-1] = dataclasses.replace(
+                previous,
+                max_ac=ac,
+                expected_damage={**previous.expected_damage, ac: damage},
+            )
+        else:
+            recommendations.append(
+                Recommendation(
+                    min_ac=ac,
+                    max_ac=ac,
+                    toggles={t.name: enabled for t, enabled in zip(toggles, state)},
+                    expected_damage={ac: damage},
+                )
+            )
+    return recommendations
@@ -0,0 +1,248 @@
+import dataclasses
+import functools
+from typing import TYPE_CHECKING, Iterable, Mapping, Sequence
+
+from pfchar.char.base import CriticalBonus, Dice
+from pfchar import utils
+
+if TYPE_CHECKING:
+    from pfchar.char.character import Snapshot
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Distribution:
+    """Probability mass function over the integers from ``minimum`` upwards."""
+
+    minimum: int
+    probabilities: tuple[float, ...]
+
+    @property
+    def maximum(self) -> int:
+        return self.minimum + len(self.probabilities) - 1
+
+    def items(self) -> Iterable[tuple[int, float]]:
+        for offset, probability in enumerate(self.probabilities):
+            if probability:
+                yield self.minimum + offset, probability
+
+    def mean(self) -> float:
+        return sum(value * probability for value, probability in self.items())
+
+    def shift(self, offset: int) -> "Distribution":
+        return Distribution(self.minimum + offset, self.probabilities)
+
+    def at_least(self, value: int) -> "Distribution":
+        """Moves all probability below ``value`` onto ``value``."""
+        if self.minimum >= value:
+            return self
+        cut = min(value - self.minimum, len(self.probabilities))
+        floor = sum(self.probabilities[:cut])
+        remainder = self.probabilities[cut:]
+        if not remainder:
+            return constant(value)
+        return Distribution(value, (floor + remainder[0],) + remainder[1:])
+
+    def __add__(self, other: "Distribution") -> "Distribution":
+        # Convolution: the distribution of the sum of both random variables.
+        if len(other.probabilities) == 1:
+            return self.shift(other.minimum)
+        if len(self.probabilities) == 1:
+            return other.shift(self.minimum)
+        result = [0.0] * (len(self.probabilities) + len(other.probabilities) - 1)
+        for i, p in enumerate(self.probabilities):
+            if p:
+                for j, q in enumerate(other.probabilities):
+                    result[i + j] += p * q
+        return Distribution(self.minimum + other.minimum, tuple(result))
+
+    def __mul__(self, times: int) -> "Distribution":
+        # Sum of ``times`` independent rolls, by repeated squaring.
+        result = constant(0)
+        base = self
+        while times:
+            if times & 1:
+                result = result + base
+            times >>= 1
+            if times:
+                base = base + base
+        return result
+
+
+def constant(value: int) -> Distribution:
+    return Distribution(value, (1.0,))
+
+
+def mix(weighted: Iterable[tuple[float, Distribution]]) -> Distribution:
+    """Combines mutually exclusive outcomes, each with its own probability."""
+    weighted = [(w, d) for w, d in weighted if w]
+    if not weighted:
+        return constant(0)
+    minimum = min(d.minimum for _, d in weighted)
+    maximum = max(d.maximum for _, d in weighted)
+    result = [0.0] * (maximum - minimum + 1)
+    for weight, distribution in weighted:
+        for value, probability in distribution.items():
+            result[value - minimum] += weight * probability
+    return Distribution(minimum, tuple(result))
+
+
+@functools.lru_cache(maxsize=None)
+def dice_distribution(dice: Dice) -> Distribution:
+    if not dice.is_variable():
+        return constant(dice.num + dice.modifier)
+    die = Distribution(1, (1.0 / dice.sides,) * dice.sides)
+    return (die * dice.num).shift(dice.modifier)
+
+
+@functools.lru_cache(maxsize=None)
+def _sum_distribution(dice: tuple[Dice, ...]) -> Distribution:
+    total = constant(0)
+    for d in dice:
+        total = total + dice_distribution(d)
+    return total
+
+
+def sum_distribution(dice_list: Iterable[Dice]) -> Distribution:
+    # Flat modifiers are folded together so they don't fragment the cache key.
+    flat = 0
+    variable = []
+    for dice in dice_list:
+        if dice.is_variable():
+            flat += dice.modifier
+            variable.append(Dice.of(dice.num, sides=dice.sides))
+        else:
+            flat += dice.num + dice.modifier
+    variable.sort(key=lambda d: (d.sides, d.num))
+    return _sum_distribution(tuple(variable)).shift(flat)
+
+
+@functools.lru_cache(maxsize=4096)
+def d20_chances(
+    attack_bonus: int, armour_class: int, crit_range: int = 20
+) -> tuple[float, float]:
+    """
+    Returns the chance of a hit and of a confirmed critical hit. A natural 1
+    always misses and a natural 20 always hits.
+    """
+    hit_rolls = sum(
+        1
+        for roll in range(2, 21)
+        if roll == 20 or roll + attack_bonus >= armour_class
+    )
+    threat_rolls = sum(
+        1
+        for roll in range(max(crit_range, 2), 21)
+        if roll == 20 or roll + attack_bonus >= armour_class
+    )
+    hit = hit_rolls / 20
+    critical = (threat_rolls / 20) * hit
+    return hit, critical
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class AttackProfile:
+    """Damage distributions of a single attack on a regular and critical hit."""
+
+    hit: Distribution
+    critical: Distribution
+    crit_range: int
+    hit_mean: float
+    critical_mean: float
+
+    def distribution(self, attack_bonus: int, armour_class: int) -> Distribution:
+        hit, critical = d20_chances(attack_bonus, armour_class, self.crit_range)
+        return mix(
+            (
+                (1.0 - hit, constant(0)),
+                (hit - critical, self.hit),
+                (critical, self.critical),
+            )
+        )
+
+    def expected_damage(self, attack_bonus: int, armour_class: int) -> float:
+        hit, critical = d20_chances(attack_bonus, armour_class, self.crit_range)
+        return (hit - critical) * self.hit_mean + critical * self.critical_mean
+
+
+@functools.lru_cache(maxsize=1024)
+def _attack_profile(
+    multiplied: tuple[Dice, ...],
+    extra: tuple[Dice, ...],
+    critical_extra: tuple[Dice, ...],
+    crit_range: int,
+    crit_multiplier: int,
+) -> AttackProfile:
+    multiplied_distribution = sum_distribution(multiplied)
+    extra_distribution = sum_distribution(extra)
+    hit = (multiplied_distribution + extra_distribution).at_least(1)
+    critical = (
+        multiplied_distribution * crit_multiplier
+        + extra_distribution
+        + sum_distribution(critical_extra)
+    ).at_least(1)
+    return AttackProfile(
+        hit=hit,
+        critical=critical,
+        crit_range=crit_range,
+        hit_mean=hit.mean(),
+        critical_mean=critical.mean(),
+    )
+
+
+def attack_profile(
+    damage: Mapping[str, Sequence[Dice]],
+    critical_bonus: CriticalBonus,
+    weapon: str | None = None,
+) -> AttackProfile:
+    """
+    Builds the damage distributions for a damage breakdown. On a critical hit
+    the weapon's base dice and all flat modifiers are multiplied, while extra
+    dice (eg, Flaming or Sneaky) are not.
+    """
+    multiplied = []
+    extra = []
+    for name, dice_list in damage.items():
+        for i, dice in enumerate(dice_list):
+            if not dice.is_variable() or (name == weapon and i == 0):
+                multiplied.append(dice)
+            else:
+                extra.append(dice)
+    return dice_profile(multiplied, extra, critical_bonus)
+
+
+def dice_profile(
+    multiplied: Iterable[Dice], extra: Iterable[Dice], critical_bonus: CriticalBonus
+) -> AttackProfile:
+    """
+    Like attack_profile, for damage already split into the dice multiplied on
+    a critical hit and the extra dice which aren't.
+    """
+    return _attack_profile(
+        tuple(multiplied),
+        tuple(extra),
+        tuple(critical_bonus.damage_bonus),
+        critical_bonus.crit_range,
+        critical_bonus.crit_multiplier,
+    )
+
+
+def sheet_profile(sheet: "Snapshot") -> AttackProfile:
+    return attack_profile(sheet.damage, sheet.critical, sheet.weapon)
+
+
+def full_attack_distribution(sheet: "Snapshot", armour_class: int) -> Distribution:
+    """Exact distribution of the total damage of a full attack."""
+    profile = sheet_profile(sheet)
+    total = constant(0)
+    for attack_bonus in utils.iterative_attacks(sheet.attack):
+        total = total + profile.distribution(attack_bonus, armour_class)
+    return total
+
+
+def expected_damage(sheet: "Snapshot", armour_class: int) -> float:
+    """Expected damage per round of a full attack against ``armour_class``."""
+    profile = sheet_profile(sheet)
+    return sum(
+        profile.expected_damage(attack_bonus, armour_class)
+        for attack_bonus in utils.iterative_attacks(sheet.attack)
+    )
@@ -0,0 +1,144 @@
+"""
+Opt-in timing of Effect hooks and Conditions.
+
+Enabling a Profiler wraps the hook methods of every Effect and Condition class
+in place, and disabling it restores the originals, so there's no cost at all
+while profiling is off. Times are inclusive of anything a hook calls, but calls
+made through super() to the same hook on the same effect are only counted once.
+
+    with Profiler() as profiler:
+        character.snapshot()
+    print(profiler.format())
+"""
+
+import dataclasses
+import functools
+import time
+
+# Imported so every Effect and Condition subclass is defined before patching.
+from pfchar.char import abilities, conditions, enchantments, feats, items  # noqa
+from pfchar.char.base import Condition, Effect
+from pfchar import utils  # noqa
+
+EFFECT_HOOKS = (
+    "attack_bonus",
+    "damage_bonus",
+    "armour_class_bonus",
+    "critical_bonus",
+    "statistic_bonus",
+    "saves_bonuses",
+    "size_change",
+)
+CONDITION_HOOK = "condition"
+
+
+@dataclasses.dataclass(slots=True)
+class HookStats:
+    cls: str
+    hook: str
+    calls: int = 0
+    total: float = 0.0
+
+    @property
+    def per_call(self) -> float:
+        return self.total / self.calls if self.calls else 0.0
+
+
+def _subclasses(cls: type) -> list[type]:
+    found = [cls]
+    for subclass in cls.__subclasses__():
+        found.extend(c for c in _subclasses(subclass) if c not in found)
+    return found
+
+
+class Profiler:
+    # Hooks are patched on the classes, so only one profiler can run at a time.
+    _enabled: "Profiler | None" = None
+
+    def __init__(self):
+        self.stats: dict[tuple[str, str], HookStats] = {}
+        self._patched: list[tuple[type, str, object]] = []
+        self._active: set[tuple[int, str]] = set()
+
+    @property
+    def enabled(self) -> bool:
+        return Profiler._enabled is self
+
+    def enable(self):
+        if Profiler._enabled is self:
+            return
+        if Profiler._enabled is not None:
+            raise RuntimeError("Another profiler is already enabled")
+        Profiler._enabled = self
+        for cls in _subclasses(Effect):
+            for hook in EFFECT_HOOKS:
+                if hook in vars(cls):
+                    self._patch(cls, hook, hook)
+        for cls in _subclasses(Condition):
+            if "__call__" in vars(cls):
+                self._patch(cls, "__call__", CONDITION_HOOK)
+
+    def disable(self):
+        if Profiler._enabled is not self:
+            return
+        for cls, attribute, original in reversed(self._patched):
+            setattr(cls, attribute, original)
+        self._patched.clear()
+        self._active.clear()
+        Profiler._enabled = None
+
+    def reset(self):
+        self.stats.clear()
+
+    def __enter__(self) -> "Profiler":
+        self.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.disable()
+
+    def _patch(self, cls: type, attribute: str, hook: str):
+        original = vars(cls)[attribute]
+        stats = self.stats
+        active = self._active
+
+        @functools.wraps(original)
+        def wrapper(obj, *args, **kwargs):
+            key = (id(obj), hook)
+            if key in active:
+                return original(obj, *args, **kwargs)
+            active.add(key)
+            start = time.perf_counter()
+            try:
+                return original(obj, *args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                active.discard(key)
+                name = type(obj).__name__
+                entry = stats.get((name, hook))
+                if entry is None:
+                    entry = stats[(name, hook)] = HookStats(name, hook)
+                entry.calls += 1
+                entry.total += elapsed
+
+        self._patched.append((cls, attribute, original))
+        setattr(cls, attribute, wrapper)
+
+    def report(self) -> list[HookStats]:
+        """Returns the recorded hooks, most total time first."""
+        return sorted(self.stats.values(), key=lambda s: s.total, reverse=True)
+
+    def format(self, limit: int | None = None) -> str:
+        rows = self.report()[:limit]
+        if not rows:
+            return "No effect hooks recorded"
+        width = max(len(f"{row.cls}.{row.hook}") for row in rows)
+        lines = [
+            f"{'Hook':<{width}}  {'Calls':>7}  {'Total ms':>9}  {'Per call us':>11}"
+        ]
+        for row in rows:
+            lines.append(
+                f"{row.cls + '.' + row.hook:<{width}}  {row.calls:>7}  "
+                f"{row.total * 1e3:>9.3f}  {row.per_call * 1e6:>11.2f}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,78 @@
+import enum
+import heapq
+import itertools
+
+from pfchar.char.base import Effect
+from pfchar.char.character import Character
+
+
+class TimeUnit(enum.StrEnum):
+    ROUNDS = "Rounds"
+    MINUTES = "Minutes"
+    HOURS = "Hours"
+
+
+ROUNDS_PER_UNIT = {
+    TimeUnit.ROUNDS: 1,
+    TimeUnit.MINUTES: 10,
+    TimeUnit.HOURS: 600,
+}
+
+
+def to_rounds(amount: int, unit: TimeUnit = TimeUnit.ROUNDS) -> int:
+    return amount * ROUNDS_PER_UNIT[unit]
+
+
+def format_rounds(rounds: int) -> str:
+    """Formats a number of rounds in the largest unit it divides evenly into."""
+    for unit in (TimeUnit.HOURS, TimeUnit.MINUTES, TimeUnit.ROUNDS):
+        per_unit = ROUNDS_PER_UNIT[unit]
+        if rounds % per_unit == 0 and (rounds >= per_unit or unit == TimeUnit.ROUNDS):
+            amount = rounds // per_unit
+            name = unit.value.lower()
+            return f"{amount} {name.removesuffix('s') if amount == 1 else name}"
+
+
+class StatusScheduler:
+    """
+    Expires statuses as game time advances. Expiry times are kept in a heap so
+    advancing only touches the statuses which actually expire. Statuses removed
+    by hand are left in the heap and skipped when they come up.
+    """
+
+    def __init__(self):
+        self.time = 0
+        self._heap: list[tuple[int, int, Character, Effect]] = []
+        self._expiry: dict[int, int] = {}
+        self._counter = itertools.count()
+
+    def schedule(self, character: Character, status: Effect, rounds: int):
+        """Expires ``status`` on ``character`` after ``rounds`` more rounds."""
+        expires = self.time + rounds
+        self._expiry[id(status)] = expires
+        heapq.heappush(self._heap, (expires, next(self._counter), character, status))
+
+    def cancel(self, status: Effect):
+        self._expiry.pop(id(status), None)
+
+    def remaining(self, status: Effect) -> int | None:
+        expires = self._expiry.get(id(status))
+        return None if expires is None else expires - self.time
+
+    def advance(self, rounds: int = 1) -> list[Character]:
+        """
+        Moves game time forward, removing every status which has run out.
+        Returns the characters which lost a status, in order of first expiry.
+        """
+        self.time += rounds
+        expired: dict[int, tuple[Character, list[Effect]]] = {}
+        while self._heap and self._heap[0][0] <= self.time:
+            expires, _, character, status = heapq.heappop(self._heap)
+            # Cancelled, or rescheduled with a different expiry.
+            if self._expiry.get(id(status)) != expires:
+                continue
+            del self._expiry[id(status)]
+            expired.setdefault(id(character), (character, []))[1].append(status)
+        for character, statuses in expired.values():
+            character.remove_statuses(statuses)
+        return [character for character, _ in expired.values()]
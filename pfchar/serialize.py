@@ -0,0 +1,364 @@
+"""
+Versioned JSON format for characters and their effects.
+
+Objects are written as JSON objects with a "__type__" key naming a class in the
+registry, and their constructor arguments as the remaining keys. Decoding is
+done in a json object_hook, so objects are built bottom-up while parsing rather
+than from an intermediate document.
+
+Libraries of characters are stored as JSON Lines, one character per line, with
+the name first so an index of names to offsets can be built without decoding
+whole characters. Characters are then decoded on demand.
+"""
+
+import dataclasses
+import enum
+import json
+import types
+import typing
+from typing import IO, Any, Callable, Iterator
+
+from pfchar.char.abilities import Ability, DeadlyCritical, WeaponsMastery
+from pfchar.char.base import Condition, CriticalBonus, Dice, Effect, NullCondition
+from pfchar.char.character import Character
+from pfchar.char.conditions import EnabledCondition, WeaponTypeCondition
+from pfchar.char.enchantments import (
+    FlamingBurst,
+    Merciful,
+    Sneaky,
+    WeaponEnchantment,
+)
+from pfchar.char.feats import (
+    Dodge,
+    Feat,
+    ImprovedCritical,
+    PowerAttack,
+    WeaponFinesse,
+    WeaponFocus,
+    WeaponTraining,
+)
+from pfchar.char.items import (
+    AmuletOfNaturalArmor,
+    Armour,
+    CelestialArmour,
+    CloakOfResistance,
+    Item,
+    RingOfProtection,
+    ShieldOfTheSun,
+    StatisticModifyingItem,
+    Weapon,
+)
+from pfchar.utils import CustomEffect
+
+VERSION = 1
+TYPE_KEY = "__type__"
+
+
+@dataclasses.dataclass(frozen=True)
+class _Codec:
+    cls: type
+    # Constructor argument name -> getter returning its value from an instance.
+    arguments: dict[str, Callable[[Any], Any]]
+    # Constructor argument name -> default, omitted when encoding if equal.
+    defaults: dict[str, Any]
+    hints: dict[str, Any]
+    # Called with the decoded arguments to build the object, the class if None.
+    factory: Callable[..., Any] | None = None
+
+
+REGISTRY: dict[str, _Codec] = {}
+
+
+def _attribute(name: str) -> Callable[[Any], Any]:
+    return lambda obj: getattr(obj, name)
+
+
+def _weapon_type(obj) -> Any:
+    return obj.condition.weapon_type
+
+
+def register(
+    cls: type,
+    arguments: dict[str, Callable[[Any], Any]] | None = None,
+    factory: Callable[..., Any] | None = None,
+):
+    """
+    Registers a class for serialisation. Without ``arguments`` the class must
+    use the dataclass generated __init__, and its init fields are serialised.
+    """
+    defaults = {}
+    if arguments is None:
+        arguments = {}
+        for field in dataclasses.fields(cls):
+            if not field.init:
+                continue
+            arguments[field.name] = _attribute(field.name)
+            if field.default is not dataclasses.MISSING:
+                defaults[field.name] = field.default
+            elif field.default_factory is not dataclasses.MISSING:
+                defaults[field.name] = field.default_factory()
+        hints = typing.get_type_hints(cls)
+    else:
+        hints = typing.get_type_hints(cls.__init__)
+    REGISTRY[cls.__name__] = _Codec(cls, arguments, defaults, hints, factory)
+
+
+def _slots(cls: type) -> tuple[str, ...]:
+    return tuple(
+        name
+        for klass in cls.__mro__
+        for name in getattr(klass, "__slots__", ())
+        if name != "__weakref__"
+    )
+
+
+def _is_default(value, default) -> bool:
+    if type(value) is not type(default):
+        return False
+    if isinstance(value, Condition):
+        # Conditions compare by identity, so compare their (slotted) state.
+        return all(
+            getattr(value, name) == getattr(default, name)
+            for name in _slots(type(value))
+        )
+    return value == default
+
+
+def _encode_key(key):
+    if isinstance(key, enum.Enum):
+        return key.value if isinstance(key, str) else key.name
+    return key
+
+
+def _encode(value):
+    if isinstance(value, enum.Enum):
+        return _encode_key(value)
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, dict):
+        return {_encode_key(k): _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_encode(v) for v in value]
+    codec = REGISTRY.get(type(value).__name__)
+    if codec is None or codec.cls is not type(value):
+        raise TypeError(f"Cannot serialise {type(value).__name__}")
+    data = {TYPE_KEY: type(value).__name__}
+    for name, getter in codec.arguments.items():
+        argument = getter(value)
+        if name in codec.defaults and _is_default(argument, codec.defaults[name]):
+            continue
+        data[name] = _encode(argument)
+    return data
+
+
+def _convert(value, hint):
+    """Converts a decoded JSON value to the type annotated on the constructor."""
+    if value is None or hint is Any:
+        return value
+    origin = typing.get_origin(hint)
+    if origin in (types.UnionType, typing.Union):
+        for arg in typing.get_args(hint):
+            if arg is not type(None):
+                return _convert(value, arg)
+    if origin is dict:
+        key_hint, value_hint = typing.get_args(hint)
+        return {
+            _convert(k, key_hint): _convert(v, value_hint) for k, v in value.items()
+        }
+    if origin is list:
+        (item_hint,) = typing.get_args(hint)
+        return [_convert(v, item_hint) for v in value]
+    if origin is tuple:
+        item_hints = typing.get_args(hint)
+        if item_hints[-1] is Ellipsis:
+            return tuple(_convert(v, item_hints[0]) for v in value)
+        return tuple(_convert(v, h) for v, h in zip(value, item_hints))
+    if isinstance(hint, type) and issubclass(hint, enum.Enum):
+        return hint(value) if issubclass(hint, str) else hint[value]
+    return value
+
+
+def _object_hook(data: dict):
+    type_name = data.pop(TYPE_KEY, None)
+    if type_name is None:
+        return data
+    try:
+        codec = REGISTRY[type_name]
+    except KeyError:
+        raise ValueError(f"Unknown type: {type_name}") from None
+    return (codec.factory or codec.cls)(
+        **{
+            name: _convert(value, codec.hints.get(name, Any))
+            for name, value in data.items()
+        }
+    )
+
+
+def encode(character: Character) -> dict:
+    return {
+        "name": character.name,
+        "version": VERSION,
+        "character": _encode(character),
+    }
+
+
+def dumps(character: Character) -> str:
+    return json.dumps(encode(character), separators=(",", ":"))
+
+
+def loads(text: str | bytes) -> Character:
+    document = json.loads(text, object_hook=_object_hook)
+    if document.get("version", 0) > VERSION:
+        raise ValueError(f"Unsupported version: {document['version']}")
+    return document["character"]
+
+
+def encode_state(character: Character) -> dict:
+    """
+    Encodes the parts of a character which change during play: statuses,
+    toggleable conditions (in all_effects() order) and two-handed wielding.
+    """
+    return {
+        "version": VERSION,
+        "two_handed": character._two_handed,
+        "toggles": [
+            effect.condition.enabled
+            for effect in character.all_effects()
+            if hasattr(effect.condition, "toggle")
+        ],
+        "statuses": _encode(character.statuses),
+    }
+
+
+def dumps_state(character: Character) -> str:
+    return json.dumps(encode_state(character), separators=(",", ":"))
+
+
+def loads_state(text: str | bytes) -> dict:
+    state = json.loads(text, object_hook=_object_hook)
+    if state.get("version", 0) > VERSION:
+        raise ValueError(f"Unsupported version: {state['version']}")
+    return state
+
+
+def apply_state(character: Character, state: dict):
+    """Applies a decoded state to a character, eg, a fork of its definition."""
+    character.statuses[:] = state["statuses"]
+    toggleable = [
+        effect
+        for effect in character.all_effects()
+        if hasattr(effect.condition, "toggle")
+    ]
+    for effect, enabled in zip(toggleable, state["toggles"]):
+        effect.condition.enabled = enabled
+    character._two_handed = state["two_handed"]
+    character.invalidate()
+
+
+def dump(characters: list[Character], fp: IO[str]):
+    """Writes characters as JSON Lines."""
+    for character in characters:
+        fp.write(dumps(character))
+        fp.write("\n")
+
+
+def load(fp: IO[str]) -> Iterator[Character]:
+    for line in fp:
+        if line.strip():
+            yield loads(line)
+
+
+class CharacterLibrary:
+    """
+    Lazily loads characters from a JSON Lines file. Only the names are read
+    when indexing, and each character is decoded the first time it's requested.
+    """
+
+    _NAME_PREFIX = b'{"name":"'
+
+    def __init__(self, path: str):
+        self.path = path
+        self._offsets: dict[str, int] = {}
+        self._loaded: dict[str, Character] = {}
+        self._index()
+
+    def _index(self):
+        offset = 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if line.startswith(self._NAME_PREFIX):
+                    name, _ = json.decoder.scanstring(
+                        line.decode("utf-8"), len(self._NAME_PREFIX)
+                    )
+                    self._offsets[name] = offset
+                elif line.strip():
+                    # Not written by dump(), fall back to decoding the line.
+                    self._offsets[json.loads(line)["name"]] = offset
+                offset += len(line)
+
+    def names(self) -> list[str]:
+        return list(self._offsets)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._offsets
+
+    def __len__(self) -> int:
+        return len(self._offsets)
+
+    def get(self, name: str) -> Character:
+        if name not in self._loaded:
+            with open(self.path, "rb") as f:
+                f.seek(self._offsets[name])
+                self._loaded[name] = loads(f.readline())
+        return self._loaded[name]
+
+
+# Decoded dice are shared, as they are for the built in characters.
+register(Dice, factory=Dice.of)
+register(CriticalBonus)
+register(NullCondition, {})
+register(EnabledCondition, {"enabled": _attribute("enabled")})
+register(WeaponTypeCondition, {"weapon_type": _attribute("weapon_type")})
+register(Effect)
+register(Ability)
+register(DeadlyCritical, {"weapon_type": _weapon_type})
+register(WeaponsMastery, {"weapon_type": _weapon_type})
+register(Feat)
+register(Dodge, {"name": _attribute("name")})
+register(WeaponFocus, {"weapon_type": _weapon_type})
+register(WeaponTraining, {"weapon_type": _weapon_type})
+register(PowerAttack)
+register(ImprovedCritical, {"weapon_type": _weapon_type})
+register(WeaponFinesse, {})
+register(
+    WeaponEnchantment,
+    {"name": _attribute("name"), "damage_dice": _attribute("_damage_dice")},
+)
+register(FlamingBurst, {})
+register(Merciful, {})
+register(Sneaky, {})
+register(Item)
+register(StatisticModifyingItem)
+register(Weapon)
+register(Armour)
+register(ShieldOfTheSun)
+register(CelestialArmour)
+register(AmuletOfNaturalArmor, {"bonus": _attribute("bonus")})
+register(RingOfProtection, {"bonus": _attribute("bonus")})
+register(CloakOfResistance, {"bonus": _attribute("bonus")})
+register(
+    CustomEffect,
+    {
+        "name": _attribute("name"),
+        "attack_bonus": _attribute("_attack_bonus"),
+        "damage_bonus": _attribute("_damage_bonus"),
+        "statistics": _attribute("_statistics"),
+        "saves": _attribute("_saves"),
+        "ac_bonuses": _attribute("_ac_bonuses"),
+        "size_change": _attribute("_size_change"),
+        "duration": _attribute("duration"),
+        "damage_dice": _attribute("_damage_dice"),
+        "bonus_type": _attribute("_bonus_type"),
+    },
+)
+register(Character)
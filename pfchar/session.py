@@ -0,0 +1,39 @@
+from typing import Iterable
+
+from pfchar.char.character import Character
+from pfchar.scheduler import StatusScheduler
+
+
+class Session:
+    """
+    A single user's view of a shared set of characters. Characters are read
+    from the shared definitions until first modified, at which point the
+    session takes its own fork so changes never leak between sessions.
+    """
+
+    def __init__(self, characters: Iterable[Character]):
+        self._shared = {c.name: c for c in characters}
+        self._forks: dict[str, Character] = {}
+        # Timed statuses only ever exist on the session's own forks.
+        self.scheduler = StatusScheduler()
+
+    def names(self) -> list[str]:
+        return list(self._shared)
+
+    def get(self, name: str) -> Character:
+        return self._forks.get(name) or self._shared[name]
+
+    def edit(self, name: str) -> Character:
+        """Returns the session's own copy of the character for modification."""
+        if name not in self._forks:
+            self._forks[name] = self._shared[name].fork()
+        return self._forks[name]
+
+    def is_modified(self, name: str) -> bool:
+        return name in self._forks
+
+    def reset(self, name: str):
+        fork = self._forks.pop(name, None)
+        if fork is not None:
+            for status in fork.statuses:
+                self.scheduler.cancel(status)
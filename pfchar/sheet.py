@@ -0,0 +1,94 @@
+"""
+Plain text rendering of a computed sheet, shared by the web UI and the CLI.
+"""
+
+from pfchar.char.base import stat_modifier, ArmorBonus, Statistic
+from pfchar.char.character import Character, Snapshot
+from pfchar.utils import crit_to_string, sum_up_dice
+
+
+def statistic_labels(character: Character, sheet: Snapshot) -> dict[str, str]:
+    labels = {}
+    for stat in Statistic:
+        value = character.statistics.get(stat, 10)
+        modifier = stat_modifier(value)
+        modified_value = sheet.statistics[stat]
+        modified_modifier = stat_modifier(modified_value)
+        if modified_value != value:
+            labels[stat.value] = (
+                f"{stat.value}: {value} ({int(modifier):+d}) -> {modified_value} ({int(modified_modifier):+d})"
+            )
+        else:
+            labels[stat.value] = f"{stat.value}: {value} ({int(modifier):+d})"
+    return labels
+
+
+PARTY_COLUMNS = (
+    "Attack",
+    "Damage",
+    "AC",
+    "Touch",
+    "Flat-footed",
+    "Fortitude",
+    "Reflex",
+    "Will",
+    "CMD",
+)
+
+
+def party_row(sheet: Snapshot) -> dict[str, str]:
+    """The key numbers of a sheet, keyed by PARTY_COLUMNS."""
+    row = {
+        "Attack": sheet.attack_string,
+        "Damage": f"{sheet.damage_string}/{crit_to_string(sheet.critical)}",
+        "AC": str(sheet.total_ac),
+        "Touch": str(sheet.touch_ac),
+        "Flat-footed": str(sheet.flat_footed_ac),
+    }
+    for save, data in sheet.saves.items():
+        row[save.value] = f"{int(sum(data.values())):+d}"
+    row["CMD"] = str(sheet.cmd_total)
+    return row
+
+
+def combat_sections(sheet: Snapshot) -> dict[str, tuple[str, tuple[str, ...]]]:
+    sections = {
+        "To Hit": (
+            f"To Hit {sheet.attack_string}",
+            tuple(f"{name}: {int(val):+d}" for name, val in sheet.attack.items()),
+        ),
+        "Damage": (
+            f"Damage {sheet.damage_string}/{crit_to_string(sheet.critical)}",
+            tuple(
+                f"{name}: {sum_up_dice(dice_list)}"
+                for name, dice_list in sheet.damage.items()
+            ),
+        ),
+        "AC": (
+            f"AC: {sheet.total_ac:d} (touch: {sheet.touch_ac:d}, flat-footed: {sheet.flat_footed_ac:d})",
+            tuple(
+                (
+                    f"{ac_type.value}: {int(val):+d} (capped)"
+                    if ac_type == ArmorBonus.DEXTERITY and sheet.dex_capped
+                    else f"{ac_type.value}: {int(val):+d}"
+                )
+                for ac_type, val in sheet.armour.items()
+            ),
+        ),
+        "CMB": (
+            f"CMB {int(sheet.cmb_total):+d}",
+            tuple(f"{name}: {int(val):+d}" for name, val in sheet.cmb.items()),
+        ),
+        "CMD": (
+            f"CMD {int(sheet.cmd_total):+d}",
+            tuple(f"{name}: {int(val):+d}" for name, val in sheet.cmd.items()),
+        ),
+    }
+    for save, data in sheet.saves.items():
+        sections[save.value] = (
+            f"{save.value} {int(sum(data.values())):+d}",
+            tuple(f"{name}: {int(val):+d}" for name, val in data.items()),
+        )
+    sections["HP Offset"] = (f"HP Offset: {int(sheet.hp_offset):+d}", ())
+    sections["Size"] = (f"Size: {sheet.size.name}", ())
+    return sections
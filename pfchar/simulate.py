@@ -0,0 +1,279 @@
+import bisect
+import collections
+import dataclasses
+import itertools
+import operator
+import random
+from typing import TYPE_CHECKING, Sequence
+
+from pfchar import probability, utils
+from pfchar.char.base import Dice
+
+if TYPE_CHECKING:
+    from pfchar.char.character import Snapshot
+
+
+MISS = 0
+HIT = 1
+CRITICAL = 2
+# SampledSimulator packs the outcome into the low bits of a sample and the
+# damage into the rest, so a whole batch can be drawn with a single choices()
+# call per attack.
+_OUTCOME_BITS = 2
+_OUTCOME_MASK = (1 << _OUTCOME_BITS) - 1
+
+_D20 = range(1, 21)
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class SimulationResult:
+    rounds: int
+    attacks: int
+    hits: int
+    criticals: int
+    mean: float
+    percentiles: dict[int, int]
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.attacks if self.attacks else 0.0
+
+    @property
+    def crit_rate(self) -> float:
+        return self.criticals / self.attacks if self.attacks else 0.0
+
+
+def _roll_dice(dice: Sequence[Dice], count: int, rng: random.Random) -> list[int]:
+    """The totals of ``count`` rolls of every die in ``dice``."""
+    totals = [0] * count
+    flat = 0
+    for d in dice:
+        if not d.is_variable():
+            flat += d.num + d.modifier
+            continue
+        flat += d.modifier
+        faces = range(1, d.sides + 1)
+        for _ in range(d.num):
+            totals = list(map(operator.add, totals, rng.choices(faces, k=count)))
+    return [total + flat for total in totals]
+
+
+class Simulator:
+    """
+    Monte Carlo full-attack simulator, rolling the d20s (including critical
+    confirmations) and damage dice of every attack, so it's an independent
+    check of the exact distributions in pfchar.probability. Rolls are drawn
+    for a whole batch of rounds at a time, one attack after the other.
+    """
+
+    def __init__(self, sheet: "Snapshot", armour_class: int):
+        self.armour_class = armour_class
+        self.attack_bonuses = tuple(utils.iterative_attacks(sheet.attack))
+        # On a critical hit the weapon's base dice and all flat modifiers are
+        # multiplied, other dice aren't.
+        multiplied = []
+        extra = []
+        for name, dice_list in sheet.damage.items():
+            for i, dice in enumerate(dice_list):
+                if not dice.is_variable() or (name == sheet.weapon and i == 0):
+                    multiplied.append(dice)
+                else:
+                    extra.append(dice)
+        self._multiplied = tuple(multiplied)
+        self._extra = tuple(extra)
+        self._critical = sheet.critical
+
+    @property
+    def profile(self) -> tuple:
+        """Everything the rolls depend on, equal for simulators which roll alike."""
+        return (
+            self.armour_class,
+            self.attack_bonuses,
+            self._multiplied,
+            self._extra,
+            self._critical,
+        )
+
+    def _hit_damage(self, count: int, rng: random.Random) -> list[int]:
+        totals = map(
+            operator.add,
+            _roll_dice(self._multiplied, count, rng),
+            _roll_dice(self._extra, count, rng),
+        )
+        return [max(total, 1) for total in totals]
+
+    def _critical_damage(self, count: int, rng: random.Random) -> list[int]:
+        totals = _roll_dice(
+            self._extra + tuple(self._critical.damage_bonus), count, rng
+        )
+        for _ in range(self._critical.crit_multiplier):
+            multiplied = _roll_dice(self._multiplied, count, rng)
+            totals = map(operator.add, totals, multiplied)
+        return [max(total, 1) for total in totals]
+
+    def roll(self, rounds: int, rng: random.Random) -> tuple[list[int], list[int]]:
+        """Returns the total damage of each round and the outcome counts."""
+        totals, hits, criticals = self.roll_rounds(rounds, rng)
+        total_hits = sum(hits)
+        total_criticals = sum(criticals)
+        outcome_counts = [0, 0, 0]
+        outcome_counts[MISS] = rounds * len(self.attack_bonuses) - total_hits
+        outcome_counts[HIT] = total_hits - total_criticals
+        outcome_counts[CRITICAL] = total_criticals
+        return totals, outcome_counts
+
+    def roll_rounds(
+        self, rounds: int, rng: random.Random
+    ) -> tuple[list[int], list[int], list[int]]:
+        """Returns the total damage, hits and critical hits of each round."""
+        totals = [0] * rounds
+        round_hits = [0] * rounds
+        round_criticals = [0] * rounds
+        threat_range = max(self._critical.crit_range, 2)
+        for attack_bonus in self.attack_bonuses:
+            # A natural 1 always misses and a natural 20 always hits.
+            hitting = {
+                roll
+                for roll in _D20
+                if roll == 20 or (roll > 1 and roll + attack_bonus >= self.armour_class)
+            }
+            d20 = rng.choices(_D20, k=rounds)
+            hits = [i for i, roll in enumerate(d20) if roll in hitting]
+            threats = [i for i in hits if d20[i] >= threat_range]
+            confirmations = rng.choices(_D20, k=len(threats))
+            criticals = [
+                i for i, roll in zip(threats, confirmations) if roll in hitting
+            ]
+            critical_set = set(criticals)
+            normal = [i for i in hits if i not in critical_set]
+            for i, damage in zip(normal, self._hit_damage(len(normal), rng)):
+                totals[i] += damage
+                round_hits[i] += 1
+            for i, damage in zip(criticals, self._critical_damage(len(criticals), rng)):
+                totals[i] += damage
+                round_hits[i] += 1
+                round_criticals[i] += 1
+        return totals, round_hits, round_criticals
+
+    def run(
+        self,
+        rounds: int,
+        seed: int | None = None,
+        batch_size: int = 100_000,
+        percentiles: tuple[int, ...] = DEFAULT_PERCENTILES,
+    ) -> SimulationResult:
+        rng = random.Random(seed)
+        histogram = collections.Counter()
+        outcome_counts = [0, 0, 0]
+        remaining = rounds
+        while remaining > 0:
+            batch = min(batch_size, remaining)
+            totals, counts = self.roll(batch, rng)
+            histogram.update(totals)
+            outcome_counts = list(map(operator.add, outcome_counts, counts))
+            remaining -= batch
+        return summarise(
+            histogram,
+            rounds=rounds,
+            attacks=rounds * len(self.attack_bonuses),
+            hits=outcome_counts[HIT] + outcome_counts[CRITICAL],
+            criticals=outcome_counts[CRITICAL],
+            percentiles=percentiles,
+        )
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class _ResolvedAttack:
+    codes: tuple[int, ...]
+    cum_weights: tuple[float, ...]
+
+
+def _resolve_attack(
+    profile: probability.AttackProfile, attack_bonus: int, armour_class: int
+) -> _ResolvedAttack:
+    hit, critical = probability.d20_chances(
+        attack_bonus, armour_class, profile.crit_range
+    )
+    outcomes = (
+        (MISS, 1.0 - hit, probability.constant(0)),
+        (HIT, hit - critical, profile.hit),
+        (CRITICAL, critical, profile.critical),
+    )
+    codes = []
+    weights = []
+    for outcome, chance, distribution in outcomes:
+        if chance <= 0:
+            continue
+        for damage, p in distribution.items():
+            codes.append((damage << _OUTCOME_BITS) | outcome)
+            weights.append(chance * p)
+    return _ResolvedAttack(tuple(codes), tuple(itertools.accumulate(weights)))
+
+
+class SampledSimulator(Simulator):
+    """
+    Fast path of the Simulator, which resolves each attack once into the exact
+    joint distribution of its outcome and damage from pfchar.probability and
+    draws one weighted sample per attack per round. Much faster, but as it
+    samples the exact model it is not a check of it.
+    """
+
+    def __init__(self, sheet: "Snapshot", armour_class: int):
+        super().__init__(sheet, armour_class)
+        profile = probability.sheet_profile(sheet)
+        self._attacks = tuple(
+            _resolve_attack(profile, attack_bonus, armour_class)
+            for attack_bonus in self.attack_bonuses
+        )
+
+    def roll(self, rounds: int, rng: random.Random) -> tuple[list[int], list[int]]:
+        totals = [0] * rounds
+        outcome_counts = [0, 0, 0]
+        for attack in self._attacks:
+            samples = rng.choices(
+                attack.codes, cum_weights=attack.cum_weights, k=rounds
+            )
+            damage = map(operator.rshift, samples, itertools.repeat(_OUTCOME_BITS))
+            totals = list(map(operator.add, totals, damage))
+            counts = collections.Counter(
+                map(operator.and_, samples, itertools.repeat(_OUTCOME_MASK))
+            )
+            for outcome, count in counts.items():
+                outcome_counts[outcome] += count
+        return totals, outcome_counts
+
+
+def summarise(
+    histogram: collections.Counter,
+    rounds: int,
+    attacks: int,
+    hits: int,
+    criticals: int,
+    percentiles: tuple[int, ...] = DEFAULT_PERCENTILES,
+) -> SimulationResult:
+    values = sorted(histogram)
+    cumulative = list(itertools.accumulate(histogram[value] for value in values))
+    total = sum(value * histogram[value] for value in values)
+    return SimulationResult(
+        rounds=rounds,
+        attacks=attacks,
+        hits=hits,
+        criticals=criticals,
+        mean=total / rounds if rounds else 0.0,
+        percentiles={
+            percentile: values[
+                bisect.bisect_left(cumulative, rounds * percentile / 100)
+            ]
+            for percentile in percentiles
+        }
+        if rounds
+        else {},
+    )
+
+
+def simulate(
+    sheet: "Snapshot", armour_class: int, rounds: int, seed: int | None = None
+) -> SimulationResult:
+    return Simulator(sheet, armour_class).run(rounds, seed=seed)
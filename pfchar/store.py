@@ -0,0 +1,137 @@
+"""
+Persists the play state of characters (statuses, toggles, two-handed) so a
+server restart doesn't lose a fight in progress.
+
+Only the state which changes during play is stored, keyed by session and
+character name, as the definitions are loaded from code or a library. Saves
+are coalesced in memory and written in a single transaction from a worker
+thread, so the asyncio event loop is never blocked on disk.
+"""
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+
+from pfchar.char.character import Character
+from pfchar import serialize
+
+logger = logging.getLogger(__name__)
+
+
+class CharacterStore:
+    def __init__(self, path: str, delay: float = 0.5):
+        self.path = path
+        self.delay = delay
+        self._pending: dict[tuple[str, str], str | None] = {}
+        self._flush_scheduled = False
+        # Kept so the task isn't garbage collected mid-flush, and can be awaited.
+        self._flush_task: asyncio.Task | None = None
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS state (
+                    session TEXT NOT NULL,
+                    name TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    updated REAL NOT NULL,
+                    PRIMARY KEY (session, name)
+                )
+                """
+            )
+
+    def load(self, session: str) -> dict[str, dict]:
+        """Returns the saved state of each character in the session by name."""
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT name, data FROM state WHERE session = ?", (session,)
+            ).fetchall()
+        states = {name: serialize.loads_state(data) for name, data in rows}
+        # Saves which haven't been flushed yet are more recent.
+        for (pending_session, name), data in list(self._pending.items()):
+            if pending_session == session:
+                if data is None:
+                    states.pop(name, None)
+                else:
+                    states[name] = serialize.loads_state(data)
+        return states
+
+    def save(self, session: str, character: Character):
+        """
+        Records the character's current state. Writes are deferred and
+        coalesced, so only the latest state of each character is written.
+        """
+        self._pending[(session, character.name)] = serialize.dumps_state(character)
+        self._schedule_flush()
+
+    def delete(self, session: str, name: str):
+        self._pending[(session, name)] = None
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self._flush_scheduled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop, the owner is responsible for calling flush().
+            return
+        self._flush_scheduled = True
+        loop.call_later(self.delay, self._start_flush)
+
+    def _start_flush(self):
+        self._flush_task = asyncio.get_running_loop().create_task(self.flush_async())
+        self._flush_task.add_done_callback(self._flush_done)
+
+    def _flush_done(self, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Failed to save character state", exc_info=task.exception())
+
+    async def flush_async(self):
+        self._flush_scheduled = False
+        pending, self._pending = self._pending, {}
+        if pending:
+            try:
+                await asyncio.to_thread(self._write, pending)
+            except BaseException:
+                # Kept for the next flush, unless saved again since.
+                self._pending = pending | self._pending
+                raise
+
+    def flush(self):
+        pending, self._pending = self._pending, {}
+        if pending:
+            self._write(pending)
+
+    def _write(self, pending: dict[tuple[str, str], str | None]):
+        now = time.time()
+        with self._lock, self._connection:
+            self._connection.executemany(
+                "DELETE FROM state WHERE session = ? AND name = ?",
+                [key for key, data in pending.items() if data is None],
+            )
+            self._connection.executemany(
+                "INSERT OR REPLACE INTO state VALUES (?, ?, ?, ?)",
+                [
+                    (session, name, data, now)
+                    for (session, name), data in pending.items()
+                    if data is not None
+                ],
+            )
+
+    async def close_async(self):
+        """Waits for a flush in progress, then writes anything left and closes."""
+        if self._flush_task is not None and not self._flush_task.done():
+            # Failures are logged by _flush_done and their states kept.
+            await asyncio.wait([self._flush_task])
+        self.close()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self._connection.close()
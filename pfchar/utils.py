@@ -1,6 +1,19 @@
-from typing import TYPE_CHECKING
-
-from pfchar.char.base import BAB_KEY, ArmorBonus, Effect, Dice, Save, Size, Statistic
+import functools
+import itertools
+from typing import TYPE_CHECKING, Iterable
+
+from pfchar.char.base import (
+    BAB_KEY,
+    ArmorBonus,
+    BonusType,
+    Contribution,
+    Effect,
+    Dice,
+    Save,
+    Size,
+    Statistic,
+)
+from pfchar.dice import parse as parse_dice
 
 if TYPE_CHECKING:
     from pfchar.char.base import CriticalBonus
@@ -9,48 +22,49 @@ if TYPE_CHECKING:
 
 # https://paizo.com/paizo/faq/v5748nruor1fm#v5748eaic9t3f
 DAMAGE_PROGRESSION = [
-    Dice(num=1, sides=1),
-    Dice(num=1, sides=2),
-    Dice(num=1, sides=3),
-    Dice(num=1, sides=4),
-    Dice(num=1, sides=6),
-    Dice(num=1, sides=8),
-    Dice(num=1, sides=10),
-    Dice(num=2, sides=6),
-    Dice(num=2, sides=8),
-    Dice(num=3, sides=6),
-    Dice(num=3, sides=8),
-    Dice(num=4, sides=6),
-    Dice(num=4, sides=8),
-    Dice(num=6, sides=6),
-    Dice(num=6, sides=8),
-    Dice(num=8, sides=6),
-    Dice(num=8, sides=8),
-    Dice(num=12, sides=6),
-    Dice(num=12, sides=8),
-    Dice(num=16, sides=6),
+    Dice.of(1, sides=1),
+    Dice.of(1, sides=2),
+    Dice.of(1, sides=3),
+    Dice.of(1, sides=4),
+    Dice.of(1, sides=6),
+    Dice.of(1, sides=8),
+    Dice.of(1, sides=10),
+    Dice.of(2, sides=6),
+    Dice.of(2, sides=8),
+    Dice.of(3, sides=6),
+    Dice.of(3, sides=8),
+    Dice.of(4, sides=6),
+    Dice.of(4, sides=8),
+    Dice.of(6, sides=6),
+    Dice.of(6, sides=8),
+    Dice.of(8, sides=6),
+    Dice.of(8, sides=8),
+    Dice.of(12, sides=6),
+    Dice.of(12, sides=8),
+    Dice.of(16, sides=6),
 ]
 
 
+SIZES = tuple(Size)
+_SIZE_INDEX = {size: i for i, size in enumerate(SIZES)}
+_PROGRESSION_INDEX = {dice: i for i, dice in enumerate(DAMAGE_PROGRESSION)}
+
+
 def get_size_change(from_size: Size, to_size: Size) -> int:
-    sizes = tuple(Size)
-    from_index = sizes.index(from_size)
-    to_index = sizes.index(to_size)
-    return to_index - from_index
+    return _SIZE_INDEX[to_size] - _SIZE_INDEX[from_size]
 
 
 def change_size(from_size: Size, size_change: int) -> Size:
-    sizes = tuple(Size)
-    from_index = sizes.index(from_size)
-    to_index = from_index + size_change
-    to_index = max(0, min(len(sizes) - 1, to_index))
-    return sizes[to_index]
+    to_index = _SIZE_INDEX[from_size] + size_change
+    to_index = max(0, min(len(SIZES) - 1, to_index))
+    return SIZES[to_index]
 
 
+@functools.lru_cache(maxsize=None)
 def get_closest_damage_progression_index(damage: Dice) -> int:
     try:
-        index = DAMAGE_PROGRESSION.index(damage)
-    except ValueError:
+        index = _PROGRESSION_INDEX[damage]
+    except KeyError:
         if damage.sides == 6:
             sixes = [
                 d for d in DAMAGE_PROGRESSION if d.sides == 6 and d.num < damage.num
@@ -72,54 +86,78 @@ def get_closest_damage_progression_index(damage: Dice) -> int:
                 s_index = sums.index(damage_sum)
             except ValueError:
                 _, s_index = min((abs(s - damage_sum), i) for i, s in enumerate(sums))
-            damage = DAMAGE_PROGRESSION[s_index]
-            index = DAMAGE_PROGRESSION.index(damage)
+            index = s_index
     return index
 
 
-def get_damage_progression(damage: Dice, from_size: Size, to_size: Size) -> Dice:
-    size_change = get_size_change(from_size, to_size)
-    if size_change == 0:
-        return damage
+def _build_progression_table() -> dict[tuple[int, int], list[int | None]]:
+    """
+    Maps the positions of (from size, to size) in SIZES to the resulting
+    progression index for each starting index, or None if the change goes
+    beyond the end of the progression. Each size step increases by one or two
+    places depending on the size and dice (see the FAQ above); a size
+    decrease checks the final size at every step.
+    """
+    small_up = _PROGRESSION_INDEX[Dice(num=1, sides=6)]
+    large_down = _PROGRESSION_INDEX[Dice(num=1, sides=8)]
+    count = len(DAMAGE_PROGRESSION)
+    small = Size.SMALL.value
+    medium = Size.MEDIUM.value
+    values = [size.value for size in SIZES]
+    # Changes of several sizes take one step and continue from the next row.
+    rows: dict[tuple[int, int], list[int | None]] = {}
+    for distance in range(1, len(SIZES)):
+        for from_pos in range(len(SIZES)):
+            for to_pos in (from_pos - distance, from_pos + distance):
+                if not 0 <= to_pos < len(SIZES):
+                    continue
+                offset = 1 if to_pos > from_pos else -1
+                row = []
+                for index in range(count):
+                    if offset > 0:
+                        big = values[from_pos] > small and index >= small_up
+                        index += 2 if big else 1
+                    else:
+                        big = values[to_pos] > medium and index > large_down
+                        index -= 2 if big else 1
+                    if index >= count:
+                        row.append(None)
+                        continue
+                    # Negative indices wrap around, as list indexing did.
+                    index %= count
+                    if distance > 1:
+                        index = rows[from_pos + offset, to_pos][index]
+                    row.append(index)
+                rows[from_pos, to_pos] = row
+    return rows
+
+
+_PROGRESSION_TABLE = _build_progression_table()
 
-    index = get_closest_damage_progression_index(damage)
 
-    # Increase by a single size step
-    offset = -1 if size_change < 0 else 1
-    if offset > 0:
-        if from_size.value <= Size.SMALL.value or index < DAMAGE_PROGRESSION.index(
-            Dice(num=1, sides=6)
-        ):
-            steps = 1
-        else:
-            steps = 2
-    elif offset < 0:
-        if to_size.value <= Size.MEDIUM.value or index <= DAMAGE_PROGRESSION.index(
-            Dice(num=1, sides=8)
-        ):
-            steps = -1
-        else:
-            steps = -2
-    else:
-        raise ValueError("Offset must be non-zero")
+def get_damage_progression(damage: Dice, from_size: Size, to_size: Size) -> Dice:
+    if from_size == to_size:
+        return damage
 
-    new_damage = DAMAGE_PROGRESSION[index + steps]
+    row = _PROGRESSION_TABLE[_SIZE_INDEX[from_size], _SIZE_INDEX[to_size]]
+    index = row[get_closest_damage_progression_index(damage)]
+    if index is None:
+        raise IndexError(f"No damage progression for {damage} at {to_size.name}")
+    return DAMAGE_PROGRESSION[index]
 
-    # If more size steps are required, recurse
-    if abs(size_change) > 1:
-        new_size = change_size(from_size, offset)
-        return get_damage_progression(new_damage, new_size, to_size)
 
-    return new_damage
+@functools.lru_cache(maxsize=1024)
+def _dice_string(num: int, sides: int, type: str | None = None) -> str:
+    return f"{num}d{sides} {type}" if type else f"{num}d{sides}"
 
 
-def sum_up_dice(dice_list: list[Dice]) -> str:
+def sum_up_dice(dice_list: Iterable[Dice]) -> str:
     values = []
     modifier = 0
     for dice in dice_list:
-        if dice.is_variable():
+        if dice.sides > 1:
             modifier += dice.modifier
-            values.append(f"{dice.num}d{dice.sides}")
+            values.append(_dice_string(dice.num, dice.sides, dice.type))
         else:
             modifier += dice.num + dice.modifier
 
@@ -131,7 +169,7 @@ def sum_up_dice(dice_list: list[Dice]) -> str:
 
 
 def sum_up_modifiers(modifiers: dict[str, list[Dice]]) -> int:
-    return sum_up_dice(dice for dice_list in modifiers.values() for dice in dice_list)
+    return sum_up_dice(itertools.chain.from_iterable(modifiers.values()))
 
 
 def crit_to_string(critical_bonus: "CriticalBonus") -> str:
@@ -144,18 +182,37 @@ def crit_to_string(critical_bonus: "CriticalBonus") -> str:
     return string
 
 
-def to_attack_string(attack_bonuses: dict[str, int]) -> str:
-    attack_bonus = sum(attack_bonuses.values())
+def iterative_attacks(attack_bonuses: dict[str, int]) -> list[int]:
+    return attack_sequence(sum(attack_bonuses.values()), attack_bonuses[BAB_KEY])
+
+
+def attack_sequence(attack_bonus: int, bab: int) -> list[int]:
+    """The bonus of each attack of a full attack, given the total bonus."""
     attacks = [attack_bonus]
-    bab = attack_bonuses[BAB_KEY]
     while bab > 5:
         bab -= 5
         attacks.append(attack_bonus - (len(attacks) * 5))
+    return attacks
 
+
+def to_attack_string(attack_bonuses: dict[str, int]) -> str:
+    attacks = iterative_attacks(attack_bonuses)
     return "/".join(f"{int(attack):+d}" for attack in attacks)
 
 
 class CustomEffect(Effect):
+    __slots__ = (
+        "duration",
+        "_attack_bonus",
+        "_damage_bonus",
+        "_damage_dice",
+        "_bonus_type",
+        "_statistics",
+        "_saves",
+        "_ac_bonuses",
+        "_size_change",
+    )
+
     def __init__(
         self,
         name: str,
@@ -165,15 +222,48 @@ class CustomEffect(Effect):
         saves: dict[Save, int],
         ac_bonuses: dict[ArmorBonus, int] = None,
         size_change: int = 0,
+        duration: int | None = None,
+        damage_dice: str | None = None,
+        bonus_type: BonusType = BonusType.UNTYPED,
     ):
         super().__init__(name=name)
+        # Total duration in rounds, or None if it lasts until removed.
+        self.duration = duration
         self._attack_bonus = attack_bonus
         self._damage_bonus = damage_bonus
+        # Dice expression, eg, "1d6 fire", parsed (and validated) up front.
+        self._damage_dice = damage_dice or None
+        if self._damage_dice:
+            parse_dice(self._damage_dice)
+        self._bonus_type = bonus_type
         self._statistics = statistics
         self._saves = saves
         self._ac_bonuses = ac_bonuses or {}
         self._size_change = size_change
 
+    def contributions(self) -> frozenset[Contribution]:
+        contributions = set()
+        if self._attack_bonus:
+            contributions.add(Contribution.ATTACK)
+        if self._damage_bonus or self._damage_dice:
+            contributions.add(Contribution.DAMAGE)
+        if self._statistics:
+            contributions |= {
+                Contribution.STATISTICS,
+                Contribution.ATTACK,
+                Contribution.DAMAGE,
+            }
+        if self._ac_bonuses:
+            contributions.add(Contribution.ARMOUR_CLASS)
+        if self._saves:
+            contributions.add(Contribution.SAVES)
+        if self._size_change:
+            contributions.add(Contribution.SIZE)
+        return frozenset(contributions)
+
+    def bonus_type(self) -> BonusType:
+        return self._bonus_type
+
     def armour_class_bonus(self, character):
         return self._ac_bonuses.copy()
 
@@ -181,17 +271,14 @@ class CustomEffect(Effect):
         return self._statistics.get(statistic, 0)
 
     def attack_bonus(self, character: "Character") -> int:
-        return self._attack_bonus + super().attack_bonus(character)
+        return self._attack_bonus
 
     def damage_bonus(self, character: "Character") -> list[Dice]:
-        bonus = super().damage_bonus(character)
-        if bonus:
-            bonus = [
-                Dice(num=d.num, sides=d.sides, modifier=d.modifier + self._damage_bonus)
-                for d in bonus
-            ]
-        elif self._damage_bonus:
-            bonus.append(Dice(self._damage_bonus))
+        bonus = []
+        if self._damage_bonus:
+            bonus.append(Dice.of(self._damage_bonus))
+        if self._damage_dice:
+            bonus.extend(parse_dice(self._damage_dice).dice)
         return bonus
 
     def saves_bonuses(self, character: "Character") -> dict[Save, int]:
@@ -209,6 +296,9 @@ def create_status_effect(
     saves: dict[Save, int] = None,
     ac_bonuses: dict[ArmorBonus, int] = None,
     size_change: int = 0,
+    duration: int | None = None,
+    damage_dice: str | None = None,
+    bonus_type: BonusType = BonusType.UNTYPED,
 ) -> "Effect":
     return CustomEffect(
         name,
@@ -218,6 +308,9 @@ def create_status_effect(
         saves or {},
         ac_bonuses or {},
         size_change,
+        duration,
+        damage_dice,
+        bonus_type,
     )
 
 
@@ -6,34 +6,111 @@ other tabs to close as well (possibly due to refreshable UI elements resetting
 the whole page?), or having the mouse over expansions while the same expansion
 is clicked in other devices still shows the click (but not the action).
 
-This may or may not work for multiple users.
+Each browser tab has its own Session, so toggles and statuses only affect that
+tab. Characters are shared between sessions until a tab first modifies one.
 """
 
-from nicegui import app, ui
-
-from pfchar.char.base import stat_modifier, ArmorBonus, Save, Size, Statistic
-from pfchar.utils import (
-    crit_to_string,
-    sum_up_dice,
-    sum_up_modifiers,
-    create_status_effect,
-    get_touch_ac,
-    get_flat_footed_ac,
-    get_total_ac,
-    to_attack_string,
-)
+import asyncio
+import os
+
+from nicegui import Client, app, ui
+
+from pfchar.char.base import ArmorBonus, BonusType, Effect, Save, Size, Statistic
+from pfchar.utils import sum_up_dice, create_status_effect
 from pfchar.char.base import Save
+from pfchar.char.character import Character, Snapshot
+from pfchar.dice import parse as parse_dice
 from pfchar.premade import YOYU, DORAMAK, CHELLYBEAN
+from pfchar.profiling import Profiler
+from pfchar.scheduler import TimeUnit, format_rounds, to_rounds
+from pfchar.session import Session
+from pfchar.sheet import PARTY_COLUMNS, combat_sections, party_row, statistic_labels
+from pfchar.store import CharacterStore
+from pfchar.whatif import key_numbers, sheet_delta, toggle_sheets
+from pfchar import api, serialize
 
 ALL_CHARACTERS = (YOYU, DORAMAK, CHELLYBEAN)
 CHARACTERS_BY_NAME = {c.name: c for c in ALL_CHARACTERS}
+# Keyed by tab ID. Kept out of app.storage.tab as that may need to be serialisable.
+SESSIONS: dict[str, Session] = {}
+STORE = CharacterStore(os.environ.get("PFCHAR_STATE", "pfchar_state.sqlite3"))
+app.on_shutdown(STORE.close_async)
+app.include_router(api.create_router(ALL_CHARACTERS))
+# Profiling patches the effect classes for every client, so it's only offered
+# when the server is started with PFCHAR_DEBUG set.
+PROFILER = Profiler() if os.environ.get("PFCHAR_DEBUG") else None
+# Seconds a client's changes are collected for before its sheet is recomputed,
+# so a burst of toggles (eg, several people at one tablet) is recomputed once.
+REFRESH_DELAY = 0.05
+# Seconds a tab's session is kept after its last client disconnects, so moving
+# between pages or reloading keeps it (and the time left on timed statuses).
+# After that it's restored from the store when the tab comes back.
+SESSION_EXPIRY = 60.0
+
+
+async def open_session() -> Session:
+    """
+    Returns the tab's session, restoring anything the tab had changed (eg,
+    before a server restart) from the store, off the event loop, if it isn't
+    in memory. Must be awaited by each page before get_session() is used.
+    """
+    tab_id = ui.context.client.tab_id
+    if tab_id not in SESSIONS:
+        states = await asyncio.to_thread(STORE.load, tab_id)
+        # Another page of the tab may have restored it in the meantime.
+        if tab_id not in SESSIONS:
+            SESSIONS[tab_id] = _restore_session(states)
+    return SESSIONS[tab_id]
+
+
+def _restore_session(states: dict[str, dict]) -> Session:
+    session = Session(ALL_CHARACTERS)
+    for name, state in states.items():
+        if name in CHARACTERS_BY_NAME:
+            character = session.edit(name)
+            serialize.apply_state(character, state)
+            # Game time isn't persisted, so timed statuses start over.
+            for status in character.statuses:
+                if getattr(status, "duration", None):
+                    session.scheduler.schedule(character, status, status.duration)
+    return session
+
+
+def get_session() -> Session:
+    return SESSIONS[ui.context.client.tab_id]
+
+
+def on_disconnect(client: Client):
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return
+    loop.call_later(SESSION_EXPIRY, _expire_session, client.tab_id)
+
+
+def _expire_session(tab_id: str):
+    # Every modification has been saved, so only the memory is released.
+    if all(client.tab_id != tab_id for client in Client.instances.values()):
+        SESSIONS.pop(tab_id, None)
+
+
+app.on_disconnect(on_disconnect)
+
+
+def get_character_name() -> str:
+    name = app.storage.tab.get("selected_character")
+    return name if name in CHARACTERS_BY_NAME else ALL_CHARACTERS[0].name
 
 
 def get_character():
     """Return the current character based on app.storage.tab selection.
     Falls back to the first character if none is stored or invalid."""
-    name = app.storage.tab.get("selected_character")
-    return CHARACTERS_BY_NAME.get(name) or ALL_CHARACTERS[0]
+    return get_session().get(get_character_name())
+
+
+def edit_character():
+    """Return the tab's own copy of the current character for modification."""
+    return get_session().edit(get_character_name())
 
 
 def expansion(name: str, default: bool = False):
@@ -51,22 +128,101 @@ def header_expansion(name: str, default: bool = False):
     )
 
 
-# Updates when statuses modify stats
-@ui.refreshable
+class SheetView:
+    """
+    Elements displaying computed values for a single client. Updates compare the
+    newly computed text with what was last sent and only touch changed elements,
+    so toggling doesn't rebuild (and collapse) the whole sheet.
+    """
+
+    def __init__(self):
+        self.labels: dict[str, ui.label] = {}
+        self.sections: dict[str, tuple[ui.expansion, ui.list]] = {}
+        self.values: dict[str, object] = {}
+
+    def bind_label(self, key: str, label: ui.label):
+        self.labels[key] = label
+        self.values[key] = label.text
+
+    def bind_section(self, key: str, section: tuple[ui.expansion, ui.list], value):
+        self.sections[key] = section
+        self.values[key] = value
+
+    def update(self, labels: dict[str, str], sections: dict[str, tuple]) -> bool:
+        """Returns False if the layout changed and the sheet must be rebuilt."""
+        if (
+            labels.keys() != self.labels.keys()
+            or sections.keys() != self.sections.keys()
+        ):
+            return False
+        for key, text in labels.items():
+            if self.values[key] != text:
+                self.labels[key].set_text(text)
+                self.values[key] = text
+        for key, (title, lines) in sections.items():
+            old_title, old_lines = self.values[key]
+            element, items = self.sections[key]
+            if old_title != title:
+                element.set_text(title)
+            if old_lines != lines:
+                items.clear()
+                with items:
+                    for line in lines:
+                        ui.item(line)
+            self.values[key] = (title, lines)
+        return True
+
+
+def get_sheet_view() -> SheetView:
+    if "sheet_view" not in app.storage.client:
+        app.storage.client["sheet_view"] = SheetView()
+    return app.storage.client["sheet_view"]
+
+
+class PartyView:
+    """
+    Cells of the party table for a single client. Each update takes every
+    character's (cached) snapshot in one pass and only recomputes the rows whose
+    snapshot has changed, touching only the cells whose text changed.
+    """
+
+    def __init__(self):
+        self.cells: dict[str, dict[str, ui.label]] = {}
+        self.sheets: dict[str, Snapshot] = {}
+        self.values: dict[str, dict[str, str]] = {}
+
+    def bind_row(
+        self, name: str, cells: dict[str, ui.label], sheet: Snapshot, row: dict
+    ):
+        self.cells[name] = cells
+        self.sheets[name] = sheet
+        self.values[name] = row
+
+    def update(self, session: Session) -> list[str]:
+        """Returns the names of the characters whose row changed."""
+        sheets = {name: session.get(name).snapshot() for name in self.cells}
+        changed = []
+        for name, sheet in sheets.items():
+            if sheet is self.sheets[name]:
+                continue
+            self.sheets[name] = sheet
+            row = party_row(sheet)
+            old = self.values[name]
+            for column, text in row.items():
+                if old[column] != text:
+                    self.cells[name][column].set_text(text)
+            if row != old:
+                self.values[name] = row
+                changed.append(name)
+        return changed
+
+
 def render_statistics():
     with header_expansion("Statistics"):
         character = get_character()
-        for stat in Statistic:
-            value = character.statistics.get(stat, 10)
-            modifier = stat_modifier(value)
-            modified_value = character.modified_statistic(stat)
-            modified_modifier = stat_modifier(modified_value)
-            if modified_value != value:
-                ui.label(
-                    f"{stat.value}: {value} ({int(modifier):+d}) -> {modified_value} ({int(modified_modifier):+d})"
-                )
-            else:
-                ui.label(f"{stat.value}: {value} ({int(modifier):+d})")
+        view = get_sheet_view()
+        for key, text in statistic_labels(character, character.snapshot()).items():
+            view.bind_label(key, ui.label(text))
 
 
 def render_weapons():
@@ -96,12 +252,13 @@ def render_items():
 def render_abilities():
     with header_expansion("Abilities"):
         character = get_character()
-        for ability in character.abilities:
+        for i, ability in enumerate(character.abilities):
             if hasattr(ability.condition, "toggle"):
 
-                def make_handler(ab):
+                def make_handler(index):
                     def handler(e):
-                        ab.condition.toggle()
+                        character = edit_character()
+                        character.toggle_condition(character.abilities[index])
                         update_combat_sections()
 
                     return handler
@@ -109,7 +266,7 @@ def render_abilities():
                 ui.switch(
                     ability.name,
                     value=ability.condition.enabled,
-                    on_change=make_handler(ability),
+                    on_change=make_handler(i),
                 )
             else:
                 ui.label(ability.name)
@@ -123,16 +280,28 @@ def render_feats():
 
 
 def on_two_handed_change(e):
-    character = get_character()
+    character = edit_character()
     if not character.toggle_two_handed():
         e.value = character.is_two_handed()
         return
     update_combat_sections()
 
 
-def make_handler(effect_):
+def toggleable_effects(character: Character) -> list[Effect]:
+    return [
+        effect
+        for effect in character.all_effects()
+        if hasattr(effect.condition, "toggle")
+    ]
+
+
+def make_handler(index: int):
+    # Effects are looked up by index as the tab may not have its own copy yet.
+    # The index is among the toggleable effects, as statuses (which come before
+    # feats and items) can be added and removed without rebuilding the switches.
     def handler(e):
-        effect_.condition.toggle()
+        character = edit_character()
+        character.toggle_condition(toggleable_effects(character)[index])
         # only refresh the combat modifiers section
         update_combat_sections()
 
@@ -140,95 +309,82 @@ def make_handler(effect_):
 
 
 def render_list(values):
-    with ui.list().props("dense").style("font-weight: normal; text-align: left"):
+    with ui.list().props("dense").style(
+        "font-weight: normal; text-align: left"
+    ) as items:
         for val in values:
             ui.item(val)
+    return items
 
 
 def render_combat_mod(text: str, values: list[str]):
     with ui.element("div").classes("flex flex-col"):
-        with expansion(text).style("font-weight: bold; text-align: center"):
-            render_list(values)
+        with expansion(text).style(
+            "font-weight: bold; text-align: center"
+        ) as element:
+            items = render_list(values)
+    return element, items
 
 
-# Make attack/damage section refreshable so computed values update
-@ui.refreshable
 def render_combat_modifiers():
     character = get_character()
-    attack_mods = character.attack_bonus()
-    damage_mods = character.damage_bonus()
-    critical_bonus = character.critical_bonus()
-    ac_bonuses = character.armour_bonuses()
-    cmb_breakdown = character.get_cmb()
-    cmd_breakdown = character.get_cmd()
-    saves_breakdown = character.get_saves()
-    attack_string = to_attack_string(attack_mods)
-    damage_total_str = sum_up_modifiers(damage_mods)
-    cmb_total = sum(cmb_breakdown.values()) if cmb_breakdown else 0
-    cmd_total = sum(cmd_breakdown.values()) if cmd_breakdown else 0
+    sheet = character.snapshot()
+    view = get_sheet_view()
     with header_expansion("Combat Modifiers", default=True):
         with ui.row():
             ui.switch(
                 "Two Handed",
-                value=character.is_two_handed(),
+                value=sheet.two_handed,
                 on_change=on_two_handed_change,
             )
-            for effect in character.all_effects():
-                if hasattr(effect.condition, "toggle"):
-                    ui.switch(
-                        effect.name,
-                        value=effect.condition.enabled,
-                        on_change=make_handler(effect),
-                    )
+            for i, effect in enumerate(toggleable_effects(character)):
+                ui.switch(
+                    effect.name,
+                    value=effect.condition.enabled,
+                    on_change=make_handler(i),
+                )
 
         with ui.element("div").classes(
             "grid grid-cols-1 md:grid-cols-5 gap-2 items-start"
         ):
-            render_combat_mod(
-                f"To Hit {attack_string}",
-                (f"{name}: {int(val):+d}" for name, val in attack_mods.items()),
-            )
-            render_combat_mod(
-                f"Damage {damage_total_str}/{crit_to_string(critical_bonus)}",
-                (
-                    f"{name}: {sum_up_dice(dice_list)}"
-                    for name, dice_list in damage_mods.items()
-                ),
-            )
-            total_ac = get_total_ac(ac_bonuses)
-            touch_ac = get_touch_ac(ac_bonuses)
-            flat_footed_ac = get_flat_footed_ac(ac_bonuses)
-            render_combat_mod(
-                f"AC: {total_ac:d} (touch: {touch_ac:d}, flat-footed: {flat_footed_ac:d})",
-                (
-                    (
-                        (
-                            f"{ac_type.value}: {int(val):+d} (capped)"
-                            if (
-                                ac_type == ArmorBonus.DEXTERITY
-                                and character.is_dex_capped()
-                            )
-                            else f"{ac_type.value}: {int(val):+d}"
-                        )
-                        for ac_type, val in ac_bonuses.items()
-                    )
-                ),
-            )
-            render_combat_mod(
-                f"CMB {int(cmb_total):+d}",
-                (f"{name}: {int(val):+d}" for name, val in cmb_breakdown.items()),
-            )
-            render_combat_mod(
-                f"CMD {int(cmd_total):+d}",
-                (f"{name}: {int(val):+d}" for name, val in cmd_breakdown.items()),
-            )
-            for save, data in saves_breakdown.items():
-                render_combat_mod(
-                    f"{save.value} {int(sum(data.values())):+d}",
-                    (f"{name}: {int(val):+d}" for name, val in data.items()),
-                )
-            render_combat_mod(f"HP Offset: {int(character.get_hp_offset()):+d}", ())
-            render_combat_mod(f"Size: {character.get_size().name}", ())
+            for key, (title, lines) in combat_sections(sheet).items():
+                view.bind_section(key, render_combat_mod(title, lines), (title, lines))
+
+
+def on_what_if_change(e):
+    if e.value:
+        render_what_if.refresh()
+
+
+@ui.refreshable
+def render_what_if():
+    with header_expansion("What If") as element:
+        element.on_value_change(on_what_if_change)
+        # The overlays are only computed while the section is open.
+        if not element.value:
+            return
+        character = get_character()
+        sheet = character.snapshot()
+        deltas = {
+            label: delta
+            for label, what_if in toggle_sheets(character).items()
+            if (delta := sheet_delta(sheet, what_if))
+        }
+        if not deltas:
+            ui.label("No toggle changes the sheet")
+            return
+        current = key_numbers(sheet)
+        names = [name for name in current if any(name in d for d in deltas.values())]
+        with ui.grid(columns=len(deltas) + 2).classes("gap-x-4 gap-y-1"):
+            ui.label("")
+            ui.label("Current").classes("font-bold")
+            for label in deltas:
+                ui.label(label).classes("font-bold")
+            for name in names:
+                ui.label(name).classes("font-bold")
+                ui.label(current[name])
+                for delta in deltas.values():
+                    ui.label(delta[name][1] if name in delta else "")
 
 
 def open_add_status_dialog():
@@ -237,42 +393,142 @@ def open_add_status_dialog():
 
 
 def delete_status(index: int):
-    character = get_character()
+    character = edit_character()
     if 0 <= index < len(character.statuses):
-        del character.statuses[index]
+        status = character.remove_status(index)
+        get_session().scheduler.cancel(status)
         render_statuses.refresh()
         update_combat_sections()
 
 
+def _advance_and_save(rounds: int) -> list[Character]:
+    changed = get_session().scheduler.advance(rounds)
+    # Only characters which lost a status are saved and recomputed.
+    tab_id = ui.context.client.tab_id
+    for character in changed:
+        STORE.save(tab_id, character)
+    return changed
+
+
+def advance_time(rounds: int):
+    changed = _advance_and_save(rounds)
+    render_statuses.refresh()
+    if any(character is get_character() for character in changed):
+        update_combat_sections()
+
+
 @ui.refreshable
 def render_statuses():
     with header_expansion("Statuses"):
         character = get_character()
+        scheduler = get_session().scheduler
         if character.statuses:
             for i, status in enumerate(character.statuses):
                 with ui.row().classes("items-center"):
-                    ui.label(status.name)
+                    remaining = scheduler.remaining(status)
+                    if remaining is None:
+                        ui.label(status.name)
+                    else:
+                        ui.label(f"{status.name} ({format_rounds(remaining)})")
                     ui.button(
                         icon="delete", on_click=lambda _, idx=i: delete_status(idx)
                     ).props("flat color=red")
         else:
             ui.label("No statuses active")
         ui.separator()
-        ui.button("Add Status", on_click=open_add_status_dialog).props(
-            "color=primary outline"
-        )
+        with ui.row().classes("items-center"):
+            ui.button("Add Status", on_click=open_add_status_dialog).props(
+                "color=primary outline"
+            )
+            for unit in TimeUnit:
+                ui.button(
+                    f"+1 {unit.value.removesuffix('s')}",
+                    on_click=lambda _, rounds=to_rounds(1, unit): advance_time(rounds),
+                ).props("flat dense")
 
 
 def update_combat_sections():
-    # re-render the computed sections
-    render_statistics.refresh()
-    render_combat_modifiers.refresh()
+    """
+    Requests a recompute of the client's sheet after the current character was
+    modified. The first request schedules a refresh REFRESH_DELAY later, and
+    any more before then are included in it.
+    """
+    # Recorded now, as the tab may switch character before the refresh.
+    app.storage.client.setdefault("modified", set()).add(get_character_name())
+    if app.storage.client.get("refresh_scheduled"):
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        # No event loop to schedule on, so refresh straight away.
+        refresh_combat_sections()
+        return
+    app.storage.client["refresh_scheduled"] = True
+    loop.call_later(REFRESH_DELAY, _scheduled_refresh, ui.context.client)
+
+
+def _scheduled_refresh(client):
+    if not client.is_deleted:
+        client.safe_invoke(refresh_combat_sections)
+
+
+def refresh_combat_sections():
+    app.storage.client["refresh_scheduled"] = False
+    # Every modification ends up here, so persist before re-rendering.
+    session = get_session()
+    for name in app.storage.client.pop("modified", ()):
+        STORE.save(ui.context.client.tab_id, session.get(name))
+    character = get_character()
+    # push only the computed values which changed
+    sheet = character.snapshot()
+    view = get_sheet_view()
+    if not view.update(statistic_labels(character, sheet), combat_sections(sheet)):
+        render_page.refresh()
+    elif app.storage.tab.get("expansion.What If"):
+        render_what_if.refresh()
+
+
+def on_profile_change(e):
+    if e.value:
+        PROFILER.enable()
+    else:
+        PROFILER.disable()
+
+
+def profile_sheet():
+    # Cached values would otherwise skip the effect hooks entirely.
+    get_character().invalidate()
+    refresh_combat_sections()
+    render_profile.refresh()
+
+
+def reset_profile():
+    PROFILER.reset()
+    render_profile.refresh()
+
+
+@ui.refreshable
+def render_profile():
+    with header_expansion("Profiling"):
+        with ui.row().classes("items-center"):
+            ui.switch(
+                "Profile effect hooks",
+                value=PROFILER.enabled,
+                on_change=on_profile_change,
+            )
+            ui.button("Recompute", on_click=profile_sheet).props("flat dense")
+            ui.button("Refresh", on_click=render_profile.refresh).props("flat dense")
+            ui.button("Reset", on_click=reset_profile).props("flat dense")
+        ui.label(PROFILER.format()).style(
+            "white-space: pre; font-family: monospace; font-size: 0.8rem"
+        )
 
 
 # Page renderer to rebuild sections for current character
 @ui.refreshable
 def render_page():
     # rebuild all sections for the selected global `character`
+    app.storage.client["sheet_view"] = SheetView()
     with ui.row():
         with ui.column().style("gap: 0.1rem; width: 100%"):
             render_statistics()
@@ -282,6 +538,9 @@ def render_page():
             render_feats()
             render_statuses()
             render_combat_modifiers()
+            render_what_if()
+            if PROFILER is not None:
+                render_profile()
 
 
 def on_character_change(name: str):
@@ -374,11 +633,29 @@ def create_status_dialog():
                 status_damage_input = ui.number(label="Damage Bonus", value=0).props(
                     "outlined dense"
                 )
+                status_dice_input = ui.input(
+                    "Damage Dice", placeholder="eg, 1d6 fire"
+                ).props("outlined dense clearable")
+                bonus_type_select = ui.select(
+                    {bonus_type: bonus_type.value for bonus_type in BonusType},
+                    value=BonusType.UNTYPED,
+                    label="Bonus Type",
+                ).props("outlined dense")
+            with ui.row():
+                duration_input = ui.number(
+                    label="Duration", value=0, min=0, precision=0
+                ).props("outlined dense")
+                duration_unit_select = ui.select(
+                    {unit: unit.value for unit in TimeUnit},
+                    value=TimeUnit.ROUNDS,
+                    label="Unit",
+                ).props("outlined dense")
 
             def clear_warning(_=None):
                 warn_label.text = ""
                 warn_label.visible = False
                 name_input.props("error=false error-message=")
+                status_dice_input.props("error=false error-message=")
 
             # Enum entry sections: Statistics, Saves, AC Bonuses
             ui.separator()
@@ -434,6 +711,8 @@ def create_status_dialog():
                     return True
                 if int(status_damage_input.value or 0) != 0:
                     return True
+                if (status_dice_input.value or "").strip():
+                    return True
                 if stat_entries or save_entries or ac_entries:
                     return True
                 return False
@@ -441,6 +720,7 @@ def create_status_dialog():
             name_input.on("input", clear_warning)
             status_attack_input.on("change", clear_warning)
             status_damage_input.on("change", clear_warning)
+            status_dice_input.on("input", clear_warning)
 
             def submit(_=None):
                 name = (name_input.value or "").strip()
@@ -458,18 +738,37 @@ def create_status_dialog():
                     warn_label.text = "At least one non-default value is required."
                     warn_label.visible = True
                     return
+                damage_dice = (status_dice_input.value or "").strip() or None
+                if damage_dice:
+                    try:
+                        parse_dice(damage_dice)
+                    except ValueError as e:
+                        status_dice_input.props(
+                            'error=true error-message="Invalid dice expression"'
+                        )
+                        warn_label.text = str(e)
+                        warn_label.visible = True
+                        return
 
-                character = get_character()
+                character = edit_character()
+                duration = to_rounds(
+                    int(duration_input.value or 0), duration_unit_select.value
+                )
                 new_status = create_status_effect(
                     name=name,
-                    attack_bonus=status_attack_input.value,
-                    damage_bonus=status_damage_input.value,
+                    attack_bonus=int(status_attack_input.value or 0),
+                    damage_bonus=int(status_damage_input.value or 0),
                     statistics=stat_entries,
                     saves=save_entries,
                     ac_bonuses=ac_entries,
                     size_change=size_change_selector.value,
+                    duration=duration or None,
+                    damage_dice=damage_dice,
+                    bonus_type=bonus_type_select.value,
                 )
-                character.statuses.append(new_status)
+                character.add_status(new_status)
+                if duration:
+                    get_session().scheduler.schedule(character, new_status, duration)
 
                 status_dialog.close()
                 render_statuses.refresh()
@@ -483,6 +782,7 @@ def create_status_dialog():
             name_input.on("keydown.enter", submit)
             status_attack_input.on("keydown.enter", submit)
             status_damage_input.on("keydown.enter", submit)
+            status_dice_input.on("keydown.enter", submit)
 
             with ui.row().classes("justify-end gap-2"):
                 ui.button("Cancel", on_click=cancel).props("flat color=grey")
@@ -491,9 +791,65 @@ def create_status_dialog():
     return status_dialog
 
 
+def update_party():
+    get_party_view().update(get_session())
+
+
+def advance_party_time(rounds: int):
+    _advance_and_save(rounds)
+    update_party()
+
+
+def get_party_view() -> PartyView:
+    if "party_view" not in app.storage.client:
+        app.storage.client["party_view"] = PartyView()
+    return app.storage.client["party_view"]
+
+
+def open_character(name: str):
+    app.storage.tab["selected_character"] = name
+    ui.navigate.to("/")
+
+
+def render_party():
+    session = get_session()
+    view = get_party_view()
+    with ui.grid(columns=len(PARTY_COLUMNS) + 1).classes("gap-x-4 gap-y-1 w-full"):
+        ui.label("Name").classes("font-bold")
+        for column in PARTY_COLUMNS:
+            ui.label(column).classes("font-bold")
+        for name in session.names():
+            sheet = session.get(name).snapshot()
+            row = party_row(sheet)
+            ui.link(name).on("click", lambda _, name=name: open_character(name))
+            cells = {column: ui.label(row[column]) for column in PARTY_COLUMNS}
+            view.bind_row(name, cells, sheet, row)
+
+
+@ui.page("/party")
+async def party_page():
+    await ui.context.client.connected()
+    await open_session()
+    with ui.header().classes("items-center"):
+        ui.button("Sheets", on_click=lambda: ui.navigate.to("/")).props(
+            "flat color=white"
+        )
+        ui.label("Party").classes("text-lg")
+    render_party()
+    with ui.row().classes("items-center"):
+        for unit in TimeUnit:
+            ui.button(
+                f"+1 {unit.value.removesuffix('s')}",
+                on_click=lambda _, rounds=to_rounds(1, unit): advance_party_time(
+                    rounds
+                ),
+            ).props("flat dense")
+
+
 @ui.page("/")
 async def page():
     await ui.context.client.connected()
+    await open_session()
     selected_name = app.storage.tab.get("selected_character")
     if selected_name not in CHARACTERS_BY_NAME:
         selected_name = ALL_CHARACTERS[0].name
@@ -502,11 +858,16 @@ async def page():
         if e.value:
             on_character_change(e.value)
 
-    with ui.header():
+    with ui.header().classes("items-center"):
         with ui.tabs(value=selected_name, on_change=handle_tab_change):
             for c in ALL_CHARACTERS:
                 ui.tab(c.name)
+        ui.space()
+        ui.button("Party", on_click=lambda: ui.navigate.to("/party")).props(
+            "flat color=white"
+        )
     render_page()
 
 
-ui.run()
+if __name__ in {"__main__", "__mp_main__"}:
+    ui.run()
@@ -0,0 +1,138 @@
+"""
+What-if comparisons: hypothetical statuses, items and toggles layered over a
+character without changing it, eg,
+
+    hasted = overlay(YOYU, statuses=[create_status_effect("Haste", attack_bonus=1)])
+    sheet_delta(YOYU.snapshot(), hasted.snapshot())  # {"Attack": (..., ...), ...}
+
+An overlay is a fork of the character, so the definition is shared rather than
+copied, and its changes are made through the character's methods, which only
+drop the cached values the changed effects contribute to. Everything else (eg,
+AC and saves when only attack changes) is shared with the base character rather
+than recomputed, so comparing several overlays costs little more than one.
+"""
+
+import collections
+import copy
+from typing import Iterable, Mapping
+
+from pfchar.char.base import Effect, Statistic
+from pfchar.char.character import Character, Snapshot
+from pfchar.sheet import party_row
+
+MAX_CACHED_TOGGLE_SHEETS = 64
+
+_toggle_sheets: collections.OrderedDict[tuple, dict[str, Snapshot]] = (
+    collections.OrderedDict()
+)
+
+
+def overlay(
+    character: Character,
+    statuses: Iterable[Effect] = (),
+    items: Iterable[Effect] = (),
+    toggles: Mapping[str, bool] | None = None,
+    two_handed: bool | None = None,
+    remove: Iterable[str] = (),
+) -> Character:
+    """
+    Returns a fork of the character with the statuses named in ``remove`` taken
+    off, ``statuses`` and ``items`` added, and toggles (including those of the
+    added effects) set by name. The character itself is left unchanged, and the
+    added effects may be shared between overlays.
+    """
+    character = character.fork()
+    for name in remove:
+        names = [status.name for status in character.statuses]
+        if name not in names:
+            raise ValueError(
+                f"Unknown status {name!r}, choose from: {', '.join(names)}"
+            )
+        character.remove_status(names.index(name))
+    for status in statuses:
+        character.add_status(_own_toggle(status))
+    for item in items:
+        character.add_item(_own_toggle(item))
+
+    toggleable = {
+        effect.name: effect
+        for effect in character.all_effects()
+        if hasattr(effect.condition, "toggle")
+    }
+    for name, enabled in (toggles or {}).items():
+        if name not in toggleable:
+            raise ValueError(
+                f"Unknown toggle {name!r}, choose from: {', '.join(toggleable)}"
+            )
+        if toggleable[name].condition.enabled != enabled:
+            character.toggle_condition(toggleable[name])
+    if two_handed is not None and character.is_two_handed() != two_handed:
+        if not character.toggle_two_handed():
+            raise ValueError(f"{character.name} can't wield two handed")
+    return character
+
+
+def _own_toggle(effect: Effect) -> Effect:
+    # Toggling an added effect must not toggle it in other overlays, as fork()
+    # does for the character's own effects.
+    if hasattr(effect.condition, "toggle"):
+        effect = copy.copy(effect)
+        effect.condition = copy.copy(effect.condition)
+    return effect
+
+
+def toggle_sheets(character: Character) -> dict[str, Snapshot]:
+    """
+    The sheet with each toggle of the character flipped, by label. One fork is
+    flipped and flipped back per toggle, as the optimiser does, so its bonuses
+    are only resolved once and each flip only recomputes what depends on it.
+    Results are kept for the last few toggle states of each set of effects.
+    """
+    # The evaluator is replaced whenever the effects change, so with the toggle
+    # state it identifies the whole sheet.
+    evaluator = character.evaluator()
+    key = (evaluator, tuple(evaluator.enabled(character)), character.is_two_handed())
+    if key in _toggle_sheets:
+        _toggle_sheets.move_to_end(key)
+        return _toggle_sheets[key]
+
+    character = character.fork()
+    sheets = {}
+    if character.can_be_two_handed():
+        character.toggle_two_handed()
+        label = f"Two Handed {'on' if character.is_two_handed() else 'off'}"
+        sheets[label] = character.snapshot()
+        character.toggle_two_handed()
+    for effect in character.all_effects():
+        if hasattr(effect.condition, "toggle"):
+            character.toggle_condition(effect)
+            label = f"{effect.name} {'on' if effect.condition.enabled else 'off'}"
+            sheets[label] = character.snapshot()
+            character.toggle_condition(effect)
+
+    _toggle_sheets[key] = sheets
+    if len(_toggle_sheets) > MAX_CACHED_TOGGLE_SHEETS:
+        _toggle_sheets.popitem(last=False)
+    return sheets
+
+
+def key_numbers(sheet: Snapshot) -> dict[str, str]:
+    """The numbers compared by sheet_delta: the party row's and a few more."""
+    numbers = {stat.value: str(sheet.statistics[stat]) for stat in Statistic}
+    numbers.update(party_row(sheet))
+    numbers["CMB"] = f"{sheet.cmb_total:+d}"
+    numbers["HP Offset"] = f"{sheet.hp_offset:+d}"
+    numbers["Size"] = sheet.size.name
+    return numbers
+
+
+def sheet_delta(base: Snapshot, sheet: Snapshot) -> dict[str, tuple[str, str]]:
+    """The key numbers which differ between two sheets, as (base, sheet)."""
+    if sheet is base:
+        return {}
+    before = key_numbers(base)
+    return {
+        name: (before[name], value)
+        for name, value in key_numbers(sheet).items()
+        if value != before[name]
+    }
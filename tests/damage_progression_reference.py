@@ -0,0 +1,90 @@
+"""
+The recursive damage progression which the lookup table in pfchar.utils
+replaced, kept as the reference it's checked and timed against.
+"""
+
+from pfchar.char.base import Dice, Size
+from pfchar.utils import DAMAGE_PROGRESSION
+
+
+def _get_size_change(from_size: Size, to_size: Size) -> int:
+    sizes = tuple(Size)
+    from_index = sizes.index(from_size)
+    to_index = sizes.index(to_size)
+    return to_index - from_index
+
+
+def _change_size(from_size: Size, size_change: int) -> Size:
+    sizes = tuple(Size)
+    from_index = sizes.index(from_size)
+    to_index = from_index + size_change
+    to_index = max(0, min(len(sizes) - 1, to_index))
+    return sizes[to_index]
+
+
+def _get_closest_damage_progression_index(damage: Dice) -> int:
+    try:
+        index = DAMAGE_PROGRESSION.index(damage)
+    except ValueError:
+        if damage.sides == 6:
+            sixes = [
+                d for d in DAMAGE_PROGRESSION if d.sides == 6 and d.num < damage.num
+            ]
+            next_lowest_num = sixes[-1].num
+            damage = Dice(num=next_lowest_num, sides=8)
+            index = DAMAGE_PROGRESSION.index(damage)
+        elif damage.sides == 8:
+            eights = [
+                d for d in DAMAGE_PROGRESSION if d.sides == 8 and d.num > damage.num
+            ]
+            next_highest_num = eights[0].num
+            damage = Dice(num=next_highest_num, sides=6)
+            index = DAMAGE_PROGRESSION.index(damage)
+        else:
+            sums = [d.num * d.sides for d in DAMAGE_PROGRESSION]
+            damage_sum = damage.num * damage.sides
+            try:
+                s_index = sums.index(damage_sum)
+            except ValueError:
+                _, s_index = min((abs(s - damage_sum), i) for i, s in enumerate(sums))
+            damage = DAMAGE_PROGRESSION[s_index]
+            index = DAMAGE_PROGRESSION.index(damage)
+    return index
+
+
+def reference_damage_progression(
+    damage: Dice, from_size: Size, to_size: Size
+) -> Dice:
+    size_change = _get_size_change(from_size, to_size)
+    if size_change == 0:
+        return damage
+
+    index = _get_closest_damage_progression_index(damage)
+
+    # Increase by a single size step
+    offset = -1 if size_change < 0 else 1
+    if offset > 0:
+        if from_size.value <= Size.SMALL.value or index < DAMAGE_PROGRESSION.index(
+            Dice(num=1, sides=6)
+        ):
+            steps = 1
+        else:
+            steps = 2
+    elif offset < 0:
+        if to_size.value <= Size.MEDIUM.value or index <= DAMAGE_PROGRESSION.index(
+            Dice(num=1, sides=8)
+        ):
+            steps = -1
+        else:
+            steps = -2
+    else:
+        raise ValueError("Offset must be non-zero")
+
+    new_damage = DAMAGE_PROGRESSION[index + steps]
+
+    # If more size steps are required, recurse
+    if abs(size_change) > 1:
+        new_size = _change_size(from_size, offset)
+        return reference_damage_progression(new_damage, new_size, to_size)
+
+    return new_damage
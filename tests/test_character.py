@@ -0,0 +1,66 @@
+import copy
+import pickle
+import random
+
+import pytest
+
+from pfchar import optimize, probability, utils
+from pfchar.char.base import BonusType, Dice
+from pfchar.char.character import WEAPON_ENCHANTMENT_KEY
+from pfchar.premade import YOYU, DORAMAK, CHELLYBEAN
+from pfchar.simulate import SampledSimulator, simulate
+from pfchar.utils import create_status_effect
+
+
+@pytest.mark.parametrize("base", [YOYU, DORAMAK, CHELLYBEAN], ids=lambda c: c.name)
+def test_copy_and_pickle_after_snapshot(base):
+    character = base.fork()
+    sheet = character.snapshot()
+    for copied in (copy.deepcopy(character), pickle.loads(pickle.dumps(character))):
+        assert copied.snapshot() == sheet
+        # Copies build their own cached values.
+        assert copied.snapshot() is not sheet
+
+
+def test_snapshot_critical_is_immutable():
+    critical = YOYU.snapshot().critical
+    assert isinstance(critical.damage_bonus, tuple)
+    hash(critical)
+
+
+def test_float_bonus_does_not_poison_shared_dice():
+    # A bonus no other test uses, so the shared Dice aren't already cached.
+    floated = DORAMAK.fork()
+    floated.add_status(create_status_effect("Float", damage_bonus=137.0))
+    floated.snapshot()
+
+    character = DORAMAK.fork()
+    character.add_status(create_status_effect("Int", damage_bonus=137))
+    sheet = character.snapshot()
+    for dice_list in sheet.damage.values():
+        for dice in dice_list:
+            assert type(dice.num) is int and type(dice.modifier) is int
+    assert simulate(sheet, 30, rounds=100, seed=0).rounds == 100
+    totals, _ = SampledSimulator(sheet, 30).roll(100, random.Random(0))
+    assert len(totals) == 100
+
+
+def test_weapon_enhancement_stacks_alike_on_attack_and_damage():
+    character = DORAMAK.fork()
+    weapon = character.main_hand
+    assert weapon.enchantment_modifier == 2
+    character.add_status(
+        create_status_effect(
+            "Greater Magic Weapon",
+            attack_bonus=4,
+            damage_bonus=4,
+            bonus_type=BonusType.ENHANCEMENT,
+        )
+    )
+    sheet = character.snapshot()
+    assert WEAPON_ENCHANTMENT_KEY not in sheet.attack
+    assert sheet.damage[weapon.name][0].modifier == 0
+    assert sheet.damage["Greater Magic Weapon"] == (Dice(4),)
+    attacks, profile = optimize.profile_key(character)
+    assert attacks == tuple(utils.iterative_attacks(sheet.attack))
+    assert profile == probability.sheet_profile(sheet)
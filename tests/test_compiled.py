@@ -0,0 +1,31 @@
+import pytest
+
+from pfchar import optimize, probability, utils
+from pfchar.char.base import Statistic
+from pfchar.char.conditions import EnabledCondition
+from pfchar.premade import YOYU, DORAMAK, CHELLYBEAN
+from pfchar.utils import create_status_effect
+
+
+def snapshot_key(character) -> tuple:
+    sheet = character.snapshot()
+    attacks = tuple(utils.iterative_attacks(sheet.attack))
+    return attacks, probability.sheet_profile(sheet)
+
+
+@pytest.mark.parametrize("base", [YOYU, DORAMAK, CHELLYBEAN], ids=lambda c: c.name)
+def test_fork_profile_key_after_two_handed(base):
+    character = base.fork()
+    status = create_status_effect("Bull's Strength", statistics={Statistic.STRENGTH: 4})
+    status.condition = EnabledCondition(True)
+    character.add_status(status)
+    # Compiles the evaluator, with damage only for the current two-handed state.
+    assert optimize.profile_key(character) == snapshot_key(character)
+
+    fork = character.fork()
+    if fork.can_be_two_handed():
+        fork.toggle_two_handed()
+    assert optimize.profile_key(fork) == snapshot_key(fork)
+    for toggle in optimize.get_toggles(fork):
+        toggle.toggle()
+        assert optimize.profile_key(fork) == snapshot_key(fork)
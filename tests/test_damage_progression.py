@@ -0,0 +1,33 @@
+import itertools
+
+from pfchar.char.base import Dice, Size
+from pfchar.utils import DAMAGE_PROGRESSION, get_damage_progression
+from tests.damage_progression_reference import reference_damage_progression
+
+
+def _outcome(func, damage, from_size, to_size):
+    try:
+        return func(damage, from_size, to_size)
+    except (IndexError, ValueError) as e:
+        return type(e)
+
+
+def test_matches_recursive_implementation():
+    # Every progression entry and a grid of other dice, between every pair of
+    # sizes, including the errors raised off the ends of the progression.
+    dice = set(DAMAGE_PROGRESSION)
+    dice.update(
+        Dice(num, sides=sides)
+        for num in range(1, 25)
+        for sides in (1, 2, 3, 4, 6, 8, 10, 12, 20)
+    )
+    checked = 0
+    for damage in sorted(dice, key=lambda d: (d.sides, d.num)):
+        for from_size, to_size in itertools.product(Size, repeat=2):
+            expected = _outcome(
+                reference_damage_progression, damage, from_size, to_size
+            )
+            actual = _outcome(get_damage_progression, damage, from_size, to_size)
+            assert actual == expected, (damage, from_size, to_size)
+            checked += 1
+    assert checked == 17_496
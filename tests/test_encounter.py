@@ -0,0 +1,43 @@
+import random
+
+from pfchar.encounter import Encounter
+from pfchar.premade import YOYU, DORAMAK
+from pfchar.simulate import Simulator
+
+
+def test_resolve_round_batches_alike_attackers(monkeypatch):
+    encounter = Encounter(seed=0)
+    target = encounter.add(DORAMAK.fork(), initiative=1)
+    goblins = [encounter.add(YOYU.fork(), initiative=10 - i) for i in range(5)]
+    for goblin in goblins:
+        goblin.target = target
+    target.target = goblins[0]
+
+    calls = []
+    roll_rounds = Simulator.roll_rounds
+
+    def counting(self, rounds, rng):
+        calls.append(rounds)
+        return roll_rounds(self, rounds, rng)
+
+    monkeypatch.setattr(Simulator, "roll_rounds", counting)
+    results = encounter.resolve_round()
+
+    # One batch for the five alike attackers and one for the target.
+    assert sorted(calls) == [1, 5]
+    assert [r.attacker for r in results] == encounter.combatants
+    assert target.damage_taken == sum(r.damage for r in results[:5])
+    assert goblins[0].damage_taken == results[5].damage
+    for result in results:
+        assert 0 <= result.criticals <= result.hits
+        assert result.hits <= len(result.attacker.simulator(0).attack_bonuses)
+
+
+def test_roll_matches_roll_rounds():
+    simulator = Simulator(YOYU.snapshot(), 30)
+    totals, counts = simulator.roll(1000, random.Random(3))
+    round_totals, hits, criticals = simulator.roll_rounds(1000, random.Random(3))
+    assert totals == round_totals
+    assert counts[1] + counts[2] == sum(hits)
+    assert counts[2] == sum(criticals)
+    assert sum(counts) == 1000 * len(simulator.attack_bonuses)
@@ -0,0 +1,40 @@
+from pfchar import batch, optimize
+from pfchar.char.base import BonusType
+from pfchar.char.conditions import EnabledCondition
+from pfchar.premade import DORAMAK
+from pfchar.utils import create_status_effect
+
+
+def _toggleable_status(name: str, enabled: bool, **bonuses):
+    status = create_status_effect(name, bonus_type=BonusType.MORALE, **bonuses)
+    status.condition = EnabledCondition(enabled)
+    return status
+
+
+def _brute_force(character, armour_class: int) -> float:
+    toggles = optimize.get_toggles(character)
+    best = 0.0
+    for flip in [None, *optimize.gray_code_flips(len(toggles))]:
+        if flip is not None:
+            toggles[flip].toggle()
+        attacks, profile = optimize.profile_key(character)
+        damage = (profile.expected_damage(a, armour_class) for a in attacks)
+        best = max(best, sum(damage))
+    return best
+
+
+def test_keeps_toggles_hidden_by_same_type_bonus():
+    # B is worth nothing while A's bigger morale bonus is enabled, but turning
+    # A off and B on beats both.
+    character = DORAMAK.fork()
+    character.add_status(_toggleable_status("A", True, attack_bonus=3, damage_bonus=-6))
+    character.add_status(_toggleable_status("B", False, attack_bonus=2))
+
+    (recommendation,) = optimize.optimise(character, [30])
+    assert recommendation.toggles["A"] is False
+    assert recommendation.toggles["B"] is True
+    assert recommendation.expected_damage[30] == _brute_force(character.fork(), 30)
+
+    cases = batch.character_cases(character)
+    states = [state for case in cases for state in case.states]
+    assert {"Two Handed": True, "A": False, "B": True} in states
@@ -0,0 +1,39 @@
+import collections
+import random
+
+import pytest
+
+from pfchar import probability
+from pfchar.premade import YOYU, DORAMAK, CHELLYBEAN
+from pfchar.simulate import SampledSimulator, Simulator
+
+ROUNDS = 50_000
+
+
+@pytest.mark.parametrize("simulator_class", [Simulator, SampledSimulator])
+@pytest.mark.parametrize("base", [YOYU, DORAMAK, CHELLYBEAN], ids=lambda c: c.name)
+@pytest.mark.parametrize("armour_class", [20, 35, 50])
+def test_matches_exact_distribution(simulator_class, base, armour_class):
+    sheet = base.snapshot()
+    simulator = simulator_class(sheet, armour_class)
+    totals, counts = simulator.roll(ROUNDS, random.Random(0))
+    histogram = collections.Counter(totals)
+    exact = dict(probability.full_attack_distribution(sheet, armour_class).items())
+    # Total variation distance between the sampled and the exact distribution.
+    distance = sum(
+        abs(histogram[value] / ROUNDS - exact.get(value, 0.0))
+        for value in histogram.keys() | exact.keys()
+    ) / 2
+    assert distance < 0.05
+
+    mean = sum(value * p for value, p in exact.items())
+    variance = sum((value - mean) ** 2 * p for value, p in exact.items())
+    standard_error = (variance / ROUNDS) ** 0.5
+    assert abs(sum(totals) / ROUNDS - mean) < 5 * standard_error + 1e-9
+
+    expected_hits = sum(
+        probability.d20_chances(attack, armour_class, sheet.critical.crit_range)[0]
+        for attack in simulator.attack_bonuses
+    )
+    assert sum(counts) == ROUNDS * len(simulator.attack_bonuses)
+    assert abs((counts[1] + counts[2]) / ROUNDS - expected_hits) < 0.02
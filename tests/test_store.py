@@ -0,0 +1,45 @@
+import asyncio
+
+from pfchar.premade import YOYU, DORAMAK
+from pfchar.store import CharacterStore
+from pfchar.utils import create_status_effect
+
+
+def test_close_waits_for_flush(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+
+    async def play():
+        store = CharacterStore(path, delay=0)
+        yoyu = YOYU.fork()
+        yoyu.add_status(create_status_effect("Bless", attack_bonus=1))
+        store.save("tab", yoyu)
+        # Let the flush start, then save more while it's writing.
+        await asyncio.sleep(0.01)
+        store.save("tab", DORAMAK)
+        await store.close_async()
+
+    asyncio.run(play())
+    states = CharacterStore(path).load("tab")
+    assert set(states) == {YOYU.name, DORAMAK.name}
+    assert [s.name for s in states[YOYU.name]["statuses"]][-1] == "Bless"
+
+
+def test_failed_flush_is_logged_and_kept(tmp_path, caplog):
+    path = str(tmp_path / "state.sqlite3")
+
+    async def play():
+        store = CharacterStore(path, delay=0)
+        write = store._write
+
+        def fail(pending):
+            store._write = write
+            raise OSError("disk full")
+
+        store._write = fail
+        store.save("tab", YOYU)
+        await asyncio.sleep(0.05)
+        await store.close_async()
+
+    asyncio.run(play())
+    assert "Failed to save character state" in caplog.text
+    assert set(CharacterStore(path).load("tab")) == {YOYU.name}
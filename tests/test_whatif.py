@@ -0,0 +1,39 @@
+import pytest
+
+from pfchar.premade import YOYU, DORAMAK, CHELLYBEAN
+from pfchar.whatif import overlay, toggle_sheets
+
+
+@pytest.mark.parametrize("base", [YOYU, DORAMAK, CHELLYBEAN], ids=lambda c: c.name)
+def test_toggle_sheets_match_overlays(base):
+    character = base.fork()
+    sheet = character.snapshot()
+    sheets = toggle_sheets(character)
+
+    expected = {}
+    if character.can_be_two_handed():
+        two_handed = not character.is_two_handed()
+        label = f"Two Handed {'on' if two_handed else 'off'}"
+        expected[label] = overlay(character, two_handed=two_handed).snapshot()
+    for effect in character.all_effects():
+        if hasattr(effect.condition, "toggle"):
+            enabled = not effect.condition.enabled
+            label = f"{effect.name} {'on' if enabled else 'off'}"
+            flipped = overlay(character, toggles={effect.name: enabled})
+            expected[label] = flipped.snapshot()
+    assert sheets == expected
+    # The character is left as it was, and the same state reuses the sheets.
+    assert character.snapshot() is sheet
+    assert toggle_sheets(character) is sheets
+
+
+def test_toggle_sheets_follow_the_toggle_state():
+    character = YOYU.fork()
+    before = toggle_sheets(character)
+    character.toggle_condition(
+        next(e for e in character.all_effects() if e.name == "Power Attack")
+    )
+    after = toggle_sheets(character)
+    assert "Power Attack off" in after and "Power Attack on" in before
+    (two_handed,) = [label for label in after if label.startswith("Two Handed")]
+    assert after[two_handed] != before[two_handed]